@@ -43,10 +43,21 @@ LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 # 去重配置
 SIMILARITY_THRESHOLD = 0.8
 DEFAULT_DEDUP_STRATEGY = "exact"
+DEDUP_ANALYSIS_CACHE_SIZE = 64  # 重复分析和策略建议结果按词条内容缓存的条数
+DEDUP_INDEX_REBUILD_RATIO = 0.8  # 按ID去重删除的词条超过词条表总数的该比例时，先删除用不到的索引，删除后重建
+DEDUP_INDEX_REBUILD_MIN_COUNT = 100000  # 按ID去重删除的词条少于该数量时逐行维护索引的开销很小，不再判断是否删除索引
+
+# 分析配置
+ANALYSIS_PARALLEL_THRESHOLD = 200000  # 指定多进程分析时，词条数超过该值才分块交给进程池，较少的词条仍在当前进程中分析
+ANALYSIS_MAX_WORKERS = os.cpu_count() or 1
+
+# 大小写转换配置
+TRANSFORM_PARALLEL_CHUNK_SIZE = 5000  # 并行转换时每个任务处理的词条数
 
 # 导出配置
 DEFAULT_EXPORT_FORMAT = "txt"
 EXPORT_BATCH_SIZE = 5000
+BACKUP_COMPRESS_LEVEL = 1  # 备份压缩包的DEFLATE级别，备份耗时主要在压缩上，1最快，9压缩率最高
 
 # 确保必要目录存在
 def ensure_directories():
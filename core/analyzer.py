@@ -3,14 +3,114 @@
 提供基于正则表达式的词条分析功能
 """
 import logging
-from typing import List, Dict, Any, Optional, Set, Tuple
+import re
+import sys
+from typing import List, Dict, Any, Optional, Set, Tuple, Callable, Iterable, Iterator
 from datetime import datetime
+from itertools import chain, islice
+from collections import deque
+from collections.abc import Mapping
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import json
 
 from .database import db_manager
 from .dictionary_manager import dictionary_manager
 from .tag_manager import tag_manager
 from utils.regex_helper import regex_helper
+from config.settings import CHUNK_SIZE, ANALYSIS_PARALLEL_THRESHOLD, ANALYSIS_MAX_WORKERS
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 进程池无法启动子进程或子进程异常退出时抛出的错误，遇到时改为在当前进程中依次分析
+_POOL_ERRORS = (BrokenProcessPool, OSError)
+
+# 模式开头的全局内联标志，如 (?i)
+_GLOBAL_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+# 不含这些元字符的模式是纯文本，可以直接用字符串查找
+_REGEX_METACHARS = frozenset('.^$*+?{}[]|()\\')
+# 形如 .*text.* 或 .*(a|b).* 的包含型模式，只要一行中出现任一文本即整行匹配
+_WRAPPED_LITERAL_RE = re.compile(r'^(?:\(\?i\))?\.\*(?:\(([^()]*)\)|([^()]*))\.\*$')
+# 反向引用在合并后组号会错位，这类模式不能参与合并
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+if hyperscan is not None:
+    # 与regex_helper的编译选项保持一致；每个模式在一个词条中只报告一次
+    _HYPERSCAN_FLAGS = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE |
+                        hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP |
+                        hyperscan.HS_FLAG_ALLOWEMPTY | hyperscan.HS_FLAG_SINGLEMATCH)
+
+
+class MatchedWordsDetail(Mapping):
+    """
+    词条到匹配模式名称列表的只读映射
+    
+    分析时只按匹配顺序记录词条和模式序号两个平行数组，
+    访问时才构建词条到模式列表的字典，避免为每个词条创建小列表。
+    """
+    
+    def __init__(self, pattern_names: List[str]):
+        """
+        初始化映射
+        
+        Args:
+            pattern_names: 模式名称列表，记录时使用其序号
+        """
+        self._pattern_names = list(pattern_names)
+        self._edge_words: List[str] = []
+        self._edge_patterns = array('i')
+        self._detail = None
+    
+    def add(self, words: List[str], pattern_index: int):
+        """
+        记录一批匹配某个模式的词条
+        
+        Args:
+            words: 匹配的词条列表
+            pattern_index: 模式序号
+        """
+        self._edge_words.extend(words)
+        self._edge_patterns.fromlist([pattern_index] * len(words))
+        self._detail = None
+    
+    def _materialize(self) -> Dict[str, List[str]]:
+        """按记录顺序构建词条到模式名称列表的字典并缓存"""
+        if self._detail is None:
+            detail = {}
+            pattern_names = self._pattern_names
+            for word, pattern_index in zip(self._edge_words, self._edge_patterns):
+                patterns = detail.get(word)
+                if patterns is None:
+                    detail[word] = [pattern_names[pattern_index]]
+                else:
+                    patterns.append(pattern_names[pattern_index])
+            self._detail = detail
+        return self._detail
+    
+    def __getitem__(self, word: str) -> List[str]:
+        return self._materialize()[word]
+    
+    def __iter__(self):
+        return iter(self._materialize())
+    
+    def __len__(self) -> int:
+        return len(self._materialize())
+    
+    def __getstate__(self):
+        # 缓存的字典可以随时重建，不随结果一起序列化
+        state = self.__dict__.copy()
+        state["_detail"] = None
+        return state
 
 
 class RegexAnalyzer:
@@ -22,22 +122,54 @@ class RegexAnalyzer:
         self.dict_manager = dictionary_manager
         self.tag_manager = tag_manager
         self.regex_helper = regex_helper
+        self._combined_pattern_cache: Dict[Tuple[Tuple[str, str], ...], Optional[re.Pattern]] = {}
+        self._hyperscan_db_cache: Dict[Tuple[Tuple[str, str], ...], Any] = {}
     
-    def analyze_words(self, words: List[str], pattern_names: List[str]) -> Dict[str, Any]:
+    def analyze_words(self, words: List[str], pattern_names: List[str],
+                      include_unmatched_list: bool = True, include_match_details: bool = True,
+                      analysis_time: str = None, parallel: bool = False) -> Dict[str, Any]:
         """
         分析词条列表
         
         Args:
             words: 词条列表
             pattern_names: 要使用的模式名称列表
+            include_unmatched_list: 是否在结果中列出未匹配的词条，为False时只统计数量
+            include_match_details: 是否记录每个词条的匹配内容和匹配到的模式
+            analysis_time: 记录在结果中的分析时间，默认为当前时间
+            parallel: 是否多进程分析，词条数不超过ANALYSIS_PARALLEL_THRESHOLD时仍在当前进程中分析
+            
+        Returns:
+            Dict[str, Any]: 分析结果
+        """
+        return self.analyze_words_iter(words, pattern_names, include_unmatched_list, include_match_details,
+                                       parallel=parallel and len(words) > ANALYSIS_PARALLEL_THRESHOLD,
+                                       analysis_time=analysis_time)
+    
+    def analyze_words_iter(self, words: Iterable[str], pattern_names: List[str],
+                           include_unmatched_list: bool = True, include_match_details: bool = True,
+                           parallel: bool = False, analysis_time: str = None) -> Dict[str, Any]:
+        """
+        分块分析词条，词条可以来自任意可迭代对象而无需一次性载入内存
+        
+        Args:
+            words: 词条的可迭代对象
+            pattern_names: 要使用的模式名称列表
+            include_unmatched_list: 是否在结果中列出未匹配的词条，为False时只统计数量
+            include_match_details: 是否记录每个词条的匹配内容(match_details)和匹配到的模式(matched_words_detail)，
+                只需要匹配词条和统计数量时可以关闭以节省内存
+            parallel: 是否将各块分发到多个进程分析，进程池不可用时改为在当前进程中分析
+            analysis_time: 记录在结果中的分析时间，默认为当前时间
             
         Returns:
             Dict[str, Any]: 分析结果
         """
         try:
+            # 模式名称会作为大量结果字典的键，驻留后比较只需比较指针
+            pattern_names = [sys.intern(pattern_name) for pattern_name in pattern_names]
             analysis_result = {
-                "analysis_time": datetime.now().isoformat(),
-                "total_words": len(words),
+                "analysis_time": analysis_time or datetime.now().isoformat(),
+                "total_words": 0,
                 "patterns_used": pattern_names,
                 "pattern_results": {},
                 "summary": {
@@ -45,50 +177,439 @@ class RegexAnalyzer:
                     "total_matches": 0,
                     "unmatched_words": 0
                 },
-                "matched_words_detail": {},
+                "matched_words_detail": MatchedWordsDetail(pattern_names),
                 "unmatched_words": []
             }
+            matched_words_detail = analysis_result["matched_words_detail"]
+            pattern_indexes = {pattern_name: index for index, pattern_name in enumerate(pattern_names)}
+            
+            pattern_results = analysis_result["pattern_results"]
+            for pattern_name in pattern_names:
+                pattern_results[pattern_name] = self._analyze_single_pattern([], pattern_name)
+            
+            if not include_unmatched_list:
+                del analysis_result["unmatched_words"]
             
             matched_words = set()
             total_matches = 0
+            total_words = 0
             
-            # 对每个模式进行分析
-            for pattern_name in pattern_names:
-                pattern_result = self._analyze_single_pattern(words, pattern_name)
-                analysis_result["pattern_results"][pattern_name] = pattern_result
+            for chunk, chunk_results in self._iter_chunk_results(words, pattern_names, parallel,
+                                                                 include_match_details):
+                total_words += len(chunk)
+                # 本块匹配的词条先汇总到块内集合，最后一次并入全局集合
+                chunk_matched_words = set()
+                
+                for pattern_name, chunk_result in chunk_results.items():
+                    pattern_result = pattern_results[pattern_name]
+                    pattern_result["matched_words"].extend(chunk_result["matched_words"])
+                    pattern_result["match_details"].update(chunk_result["match_details"])
+                    pattern_result["total_matches"] += chunk_result["total_matches"]
+                    
+                    # 更新统计信息
+                    if chunk_result["matched_words"]:
+                        chunk_matched_words.update(chunk_result["matched_words"])
+                        if include_match_details:
+                            matched_words_detail.add(chunk_result["matched_words"], pattern_indexes[pattern_name])
+                    
+                    total_matches += chunk_result["total_matches"]
                 
-                # 更新统计信息
-                for word in pattern_result["matched_words"]:
-                    matched_words.add(word)
-                    if word not in analysis_result["matched_words_detail"]:
-                        analysis_result["matched_words_detail"][word] = []
-                    analysis_result["matched_words_detail"][word].append(pattern_name)
+                matched_words |= chunk_matched_words
                 
-                total_matches += pattern_result["total_matches"]
+                # 获取未匹配的词条，本块没有新匹配时整块都未匹配；
+                # 匹配与否只取决于词条本身，所以只需要查块内集合
+                if include_unmatched_list:
+                    if not chunk_matched_words:
+                        analysis_result["unmatched_words"].extend(chunk)
+                    else:
+                        analysis_result["unmatched_words"].extend(
+                            word for word in chunk if word not in chunk_matched_words)
+            
+            for pattern_result in pattern_results.values():
+                pattern_result["match_rate"] = len(pattern_result["matched_words"]) / total_words * 100 if total_words else 0
             
             # 计算汇总信息
+            analysis_result["total_words"] = total_words
             analysis_result["summary"]["matched_words"] = len(matched_words)
             analysis_result["summary"]["total_matches"] = total_matches
-            analysis_result["summary"]["unmatched_words"] = len(words) - len(matched_words)
-            analysis_result["summary"]["match_rate"] = len(matched_words) / len(words) * 100 if words else 0
-            
-            # 获取未匹配的词条
-            analysis_result["unmatched_words"] = [word for word in words if word not in matched_words]
+            analysis_result["summary"]["unmatched_words"] = total_words - len(matched_words)
+            analysis_result["summary"]["match_rate"] = len(matched_words) / total_words * 100 if total_words else 0
             
-            logging.info(f"词条分析完成: {len(words)} 个词条, {len(matched_words)} 个匹配")
+            logging.info(f"词条分析完成: {total_words} 个词条, {len(matched_words)} 个匹配")
             return analysis_result
             
         except Exception as e:
             logging.error(f"词条分析失败: {e}")
             return {}
     
-    def _analyze_single_pattern(self, words: List[str], pattern_name: str) -> Dict[str, Any]:
+    def _iter_chunk_results(self, words: Iterable[str], pattern_names: List[str], parallel: bool,
+                            include_match_details: bool = True) -> Iterator[Tuple[List[str], Dict[str, Dict[str, Any]]]]:
+        """
+        将词条按CHUNK_SIZE分块并依次产出每块的分析结果
+        
+        并行时各块交给进程池分析，同时在途的块数有上限以控制内存，结果仍按原顺序产出。
+        进程池无法启动或中途损坏时，尚未产出结果的块和其余的块改为在当前进程中分析。
+        
+        Args:
+            words: 词条的可迭代对象
+            pattern_names: 要使用的模式名称列表
+            parallel: 是否使用进程池
+            include_match_details: 是否记录每个词条的匹配内容
+            
+        Yields:
+            Tuple[List[str], Dict[str, Dict[str, Any]]]: (词条块, 该块的分析结果)
+        """
+        word_iter = iter(words)
+        chunks = iter(lambda: list(islice(word_iter, CHUNK_SIZE)), [])
+        
+        if not parallel:
+            for chunk in chunks:
+                yield chunk, self._analyze_chunk(chunk, pattern_names, include_match_details)
+            return
+        
+        # 块在产出结果后才从pending_chunks中移除，进程池出错时其中就是需要重新分析的块
+        pending_chunks = deque()
+        pending_futures = deque()
+        try:
+            with ProcessPoolExecutor(max_workers=ANALYSIS_MAX_WORKERS) as executor:
+                for chunk in chunks:
+                    pending_chunks.append(chunk)
+                    pending_futures.append(executor.submit(_analyze_chunk_worker, chunk, pattern_names,
+                                                           include_match_details))
+                    if len(pending_futures) >= ANALYSIS_MAX_WORKERS * 2:
+                        chunk_results = pending_futures.popleft().result()
+                        yield pending_chunks.popleft(), chunk_results
+                
+                while pending_futures:
+                    chunk_results = pending_futures.popleft().result()
+                    yield pending_chunks.popleft(), chunk_results
+        except _POOL_ERRORS as e:
+            logging.warning(f"进程池不可用，改为在当前进程中分析: {e}")
+            for chunk in chain(pending_chunks, chunks):
+                yield chunk, self._analyze_chunk(chunk, pattern_names, include_match_details)
+    
+    def _analyze_chunk(self, words: List[str], pattern_names: List[str],
+                       include_match_details: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        分析一块词条
+        
+        Args:
+            words: 词条列表
+            pattern_names: 要使用的模式名称列表
+            include_match_details: 是否记录每个词条的匹配内容
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: 模式名称到单个模式分析结果的映射
+        """
+        pattern_infos = {name: self.regex_helper.get_pattern_info(name) for name in pattern_names}
+        
+        # 只有一个模式时预筛选只是把同一个模式多跑一遍，直接逐个匹配
+        if len(pattern_names) == 1:
+            pattern_name = pattern_names[0]
+            return {
+                pattern_name: self._analyze_single_pattern(words, pattern_name,
+                                                           pattern_info=pattern_infos[pattern_name],
+                                                           include_match_details=include_match_details)
+            }
+        
+        # 纯文本模式直接用字符串查找，不需要预筛选
+        literal_names = [name for name in pattern_names if self._get_literal_pattern(name) is not None]
+        regex_names = [name for name in pattern_names if name not in literal_names]
+        candidates_by_pattern = dict.fromkeys(literal_names, words)
+        
+        # 再筛选正则模式的候选词条：有Hyperscan时一次扫描即可得到每个词条命中的模式，
+        # 否则用合并正则排除一个模式都匹配不上的词条
+        hyperscan_db = self._get_hyperscan_database(regex_names) if regex_names else None
+        if hyperscan_db is not None:
+            candidates_by_pattern.update(self._scan_with_hyperscan(hyperscan_db, words, regex_names))
+        elif regex_names:
+            combined_pattern = self._get_combined_pattern(regex_names)
+            if combined_pattern is not None:
+                search = combined_pattern.search
+                candidates = [word for word in words if search(word)]
+            else:
+                candidates = words
+            candidates_by_pattern.update(dict.fromkeys(regex_names, candidates))
+        
+        return {
+            pattern_name: self._analyze_single_pattern(candidates_by_pattern[pattern_name], pattern_name,
+                                                       total_words=len(words),
+                                                       pattern_info=pattern_infos[pattern_name],
+                                                       include_match_details=include_match_details)
+            for pattern_name in pattern_names
+        }
+    
+    def _get_literal_pattern(self, pattern_name: str) -> Optional[str]:
+        """
+        判断模式是否为纯文本
+        
+        Args:
+            pattern_name: 模式名称
+            
+        Returns:
+            Optional[str]: 纯ASCII且不含正则元字符时返回模式文本，否则返回None
+        """
+        pattern_info = self.regex_helper.get_pattern_info(pattern_name)
+        if not pattern_info:
+            return None
+        
+        pattern_str = pattern_info["pattern"]
+        if not pattern_str or not pattern_str.isascii() or _REGEX_METACHARS.intersection(pattern_str):
+            return None
+        return pattern_str
+    
+    def _get_wrapped_literals(self, pattern_name: str) -> Optional[Tuple[List[str], bool]]:
+        """
+        判断模式是否为 .*text.* 或 .*(a|b).* 形式的包含型模式
+        
+        Args:
+            pattern_name: 模式名称
+            
+        Returns:
+            Optional[Tuple[List[str], bool]]: (小写的候选文本列表, 是否带捕获组)，不是该形式时返回None
+        """
+        pattern_info = self.regex_helper.get_pattern_info(pattern_name)
+        if not pattern_info:
+            return None
+        
+        wrapped = _WRAPPED_LITERAL_RE.match(pattern_info["pattern"])
+        if not wrapped:
+            return None
+        
+        has_group = wrapped.group(1) is not None
+        alternatives = (wrapped.group(1) if has_group else wrapped.group(2)).split('|')
+        if not has_group and len(alternatives) > 1:
+            # .*a|b.* 的交替作用于整个模式，不是简单的包含判断
+            return None
+        for alternative in alternatives:
+            if not alternative or not alternative.isascii() or _REGEX_METACHARS.intersection(alternative):
+                return None
+        return [alternative.lower() for alternative in alternatives], has_group
+    
+    def _get_matcher(self, pattern_name: str) -> Callable[[str], List[str]]:
+        """
+        获取模式的匹配函数，返回值与re.findall一致
+        
+        纯文本模式用字符串查找代替正则；模式按忽略大小写编译，
+        含字母的纯文本只对ASCII词条做小写查找，其余词条仍交给正则。
+        
+        Args:
+            pattern_name: 模式名称
+            
+        Returns:
+            Callable[[str], List[str]]: 词条到匹配结果列表的函数
+        """
+        compiled_pattern = self.regex_helper.get_compiled(pattern_name)
+        if compiled_pattern is None:
+            logging.warning(f"模式不存在: {pattern_name}")
+            return lambda word: []
+        regex_match = compiled_pattern.findall
+        
+        wrapped = self._get_wrapped_literals(pattern_name)
+        if wrapped is not None:
+            return self._get_wrapped_matcher(wrapped[0], wrapped[1], regex_match)
+        
+        literal = self._get_literal_pattern(pattern_name)
+        if literal is None:
+            return regex_match
+        
+        if literal.lower() == literal.upper():
+            # 不含字母，大小写无关
+            def literal_match(word: str) -> List[str]:
+                return [literal] * word.count(literal)
+        else:
+            folded = literal.lower()
+            size = len(folded)
+            
+            def literal_match(word: str) -> List[str]:
+                if not word.isascii():
+                    return regex_match(word)
+                
+                haystack = word.lower()
+                matches = []
+                start = haystack.find(folded)
+                while start != -1:
+                    matches.append(word[start:start + size])
+                    start = haystack.find(folded, start + size)
+                return matches
+        
+        return literal_match
+    
+    def _get_wrapped_matcher(self, alternatives: List[str], has_group: bool,
+                             regex_match: Callable[[str], List[str]]) -> Callable[[str], List[str]]:
+        """
+        为包含型模式生成字符串查找实现的匹配函数
+        
+        单行ASCII词条的匹配结果可以直接推出：不带捕获组时是整个词条；
+        带捕获组时前面的 .* 是贪婪的，取最靠右出现的位置，同一位置按交替顺序取第一个。
+        多行或非ASCII词条仍交给正则。
+        
+        Args:
+            alternatives: 小写的候选文本列表
+            has_group: 是否带捕获组
+            regex_match: 原正则的findall
+            
+        Returns:
+            Callable[[str], List[str]]: 词条到匹配结果列表的函数
+        """
+        if not has_group:
+            needle = alternatives[0]
+            
+            def wrapped_match(word: str) -> List[str]:
+                if not word.isascii() or '\n' in word:
+                    return regex_match(word)
+                return [word] if needle in word.lower() else []
+            
+            return wrapped_match
+        
+        def wrapped_group_match(word: str) -> List[str]:
+            if not word.isascii() or '\n' in word:
+                return regex_match(word)
+            
+            haystack = word.lower()
+            start = -1
+            found = None
+            for alternative in alternatives:
+                position = haystack.rfind(alternative)
+                if position > start:
+                    start = position
+                    found = alternative
+            if found is None:
+                return []
+            return [word[start:start + len(found)]]
+        
+        return wrapped_group_match
+    
+    def _get_combined_pattern(self, pattern_names: List[str]) -> Optional[re.Pattern]:
+        """
+        获取多个模式合并成的单个交替正则，用于一次扫描筛选候选词条
+        
+        交替匹配是最左优先的，同一位置只会命中其中一个模式，
+        所以合并正则只用来判断词条是否可能匹配，具体结果仍按模式逐个计算。
+        
+        Args:
+            pattern_names: 模式名称列表
+            
+        Returns:
+            Optional[re.Pattern]: 合并后的正则，无法合并时返回None
+        """
+        pattern_strs = []
+        for pattern_name in pattern_names:
+            pattern_info = self.regex_helper.get_pattern_info(pattern_name)
+            if not pattern_info:
+                return None
+            pattern_strs.append((pattern_name, pattern_info["pattern"]))
+        
+        cache_key = tuple(sorted(pattern_strs))
+        if cache_key in self._combined_pattern_cache:
+            return self._combined_pattern_cache[cache_key]
+        
+        combined = None
+        alternatives = []
+        for _, pattern_str in cache_key:
+            if _BACKREF_RE.search(pattern_str):
+                break
+            # 全局内联标志只能出现在表达式开头，合并前改写为局部标志
+            flags_match = _GLOBAL_FLAGS_RE.match(pattern_str)
+            if flags_match:
+                pattern_str = f"(?{flags_match.group(1)}:{pattern_str[flags_match.end():]})"
+            alternatives.append(f"(?:{pattern_str})")
+        else:
+            try:
+                combined = re.compile('|'.join(alternatives), re.IGNORECASE | re.MULTILINE)
+            except re.error as e:
+                logging.warning(f"合并正则编译失败，逐个模式扫描: {e}")
+        
+        self._combined_pattern_cache[cache_key] = combined
+        return combined
+    
+    def _get_hyperscan_database(self, pattern_names: List[str]) -> Any:
+        """
+        获取多个模式编译成的Hyperscan数据库，模式ID即其在pattern_names中的下标
+        
+        Args:
+            pattern_names: 模式名称列表
+            
+        Returns:
+            Any: Hyperscan数据库，未安装Hyperscan或模式无法编译时返回None
+        """
+        if hyperscan is None:
+            return None
+        
+        pattern_strs = []
+        for pattern_name in pattern_names:
+            pattern_info = self.regex_helper.get_pattern_info(pattern_name)
+            if not pattern_info:
+                return None
+            pattern_strs.append((pattern_name, pattern_info["pattern"]))
+        
+        cache_key = tuple(pattern_strs)
+        if cache_key in self._hyperscan_db_cache:
+            return self._hyperscan_db_cache[cache_key]
+        
+        database = None
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[pattern_str.encode('utf-8') for _, pattern_str in cache_key],
+                ids=list(range(len(cache_key))),
+                elements=len(cache_key),
+                flags=[_HYPERSCAN_FLAGS] * len(cache_key)
+            )
+        except Exception as e:
+            database = None
+            logging.warning(f"Hyperscan编译失败，使用re扫描: {e}")
+        
+        self._hyperscan_db_cache[cache_key] = database
+        return database
+    
+    def _scan_with_hyperscan(self, database: Any, words: List[str], pattern_names: List[str]) -> Dict[str, List[str]]:
+        """
+        用Hyperscan扫描词条，得到每个模式的候选词条
+        
+        Args:
+            database: _get_hyperscan_database返回的数据库
+            words: 词条列表
+            pattern_names: 模式名称列表
+            
+        Returns:
+            Dict[str, List[str]]: 模式名称到候选词条列表的映射
+        """
+        candidate_lists = [[] for _ in pattern_names]
+        hit_ids = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hit_ids.append(pattern_id)
+        
+        scan = database.scan
+        for word in words:
+            try:
+                data = word.encode('utf-8')
+            except UnicodeEncodeError:
+                # 无法编码的词条交给re逐个模式处理
+                for candidate_list in candidate_lists:
+                    candidate_list.append(word)
+                continue
+            
+            scan(data, match_event_handler=on_match)
+            for pattern_id in hit_ids:
+                candidate_lists[pattern_id].append(word)
+            hit_ids.clear()
+        
+        return dict(zip(pattern_names, candidate_lists))
+    
+    def _analyze_single_pattern(self, words: List[str], pattern_name: str,
+                                total_words: int = None, pattern_info: Dict[str, Any] = None,
+                                include_match_details: bool = True) -> Dict[str, Any]:
         """
         使用单个模式分析词条
         
         Args:
             words: 词条列表
             pattern_name: 模式名称
+            total_words: 计算匹配率使用的总词条数，默认为words的长度
+            pattern_info: 已查询到的模式信息，为None时从regex_helper获取
+            include_match_details: 是否记录每个词条的匹配内容，为False时match_details为空
             
         Returns:
             Dict[str, Any]: 单个模式的分析结果
@@ -102,32 +623,52 @@ class RegexAnalyzer:
         }
         
         try:
-            pattern_info = self.regex_helper.get_pattern_info(pattern_name)
+            if pattern_info is None:
+                pattern_info = self.regex_helper.get_pattern_info(pattern_name)
             if pattern_info:
                 result["pattern_description"] = pattern_info.get("description", "")
                 result["pattern_regex"] = pattern_info.get("pattern", "")
             
+            # 热循环中只使用局部变量
+            find_matches = self._get_matcher(pattern_name)
+            matched_words = []
+            matched_append = matched_words.append
+            match_details = {}
+            total_matches = 0
             for word in words:
-                matches = self.regex_helper.match_pattern(word, pattern_name)
+                matches = find_matches(word)
                 if matches:
-                    result["matched_words"].append(word)
-                    result["match_details"][word] = matches
-                    result["total_matches"] += len(matches)
+                    matched_append(word)
+                    if include_match_details:
+                        match_details[word] = matches
+                    total_matches += len(matches)
             
-            result["match_rate"] = len(result["matched_words"]) / len(words) * 100 if words else 0
+            result["matched_words"] = matched_words
+            result["match_details"] = match_details
+            result["total_matches"] = total_matches
+            
+            if total_words is None:
+                total_words = len(words)
+            result["match_rate"] = len(matched_words) / total_words * 100 if total_words else 0
             
         except Exception as e:
             logging.error(f"单模式分析失败 {pattern_name}: {e}")
         
         return result
     
-    def analyze_dictionary(self, dictionary_id: int, pattern_names: List[str]) -> Dict[str, Any]:
+    def analyze_dictionary(self, dictionary_id: int, pattern_names: List[str],
+                           include_unmatched_list: bool = True, parallel: bool = False,
+                           include_match_details: bool = True, analysis_time: str = None) -> Dict[str, Any]:
         """
         分析字典中的词条
         
         Args:
             dictionary_id: 字典ID
             pattern_names: 要使用的模式名称列表
+            include_unmatched_list: 是否在结果中列出未匹配的词条
+            parallel: 是否多进程分析，字典词条数不超过ANALYSIS_PARALLEL_THRESHOLD时仍在当前进程中分析
+            include_match_details: 是否记录每个词条的匹配内容和匹配到的模式
+            analysis_time: 记录在结果中的分析时间，默认为当前时间
             
         Returns:
             Dict[str, Any]: 分析结果
@@ -138,21 +679,21 @@ class RegexAnalyzer:
             if not dictionary:
                 raise ValueError(f"字典不存在: ID {dictionary_id}")
             
-            # 获取字典中的所有词条
-            words_data = self.db.fetch_all(
+            # 分批读取字典中的词条并分析，重复的词条驻留后共享同一个对象
+            words = (sys.intern(row['word']) for row in self.db.iter_rows(
                 "SELECT word FROM words WHERE dictionary_id = ?",
                 (dictionary_id,)
-            )
+            ))
             
-            words = [row['word'] for row in words_data]
+            parallel = parallel and dictionary.get("word_count", 0) > ANALYSIS_PARALLEL_THRESHOLD
             
-            if not words:
+            analysis_result = self.analyze_words_iter(words, pattern_names, include_unmatched_list,
+                                                      include_match_details, parallel, analysis_time)
+            
+            if not analysis_result.get("total_words"):
                 logging.warning(f"字典 {dictionary_id} 中没有词条")
                 return {}
             
-            # 执行分析
-            analysis_result = self.analyze_words(words, pattern_names)
-            
             # 添加字典信息
             analysis_result["dictionary_info"] = {
                 "id": dictionary_id,
@@ -166,33 +707,75 @@ class RegexAnalyzer:
             logging.error(f"字典分析失败: {e}")
             return {}
     
-    def batch_analyze_dictionaries(self, dictionary_ids: List[int], pattern_names: List[str]) -> Dict[int, Dict[str, Any]]:
+    def batch_analyze_dictionaries(self, dictionary_ids: List[int], pattern_names: List[str],
+                                   include_match_details: bool = True,
+                                   parallel: bool = False) -> Dict[int, Dict[str, Any]]:
         """
         批量分析多个字典
         
         Args:
             dictionary_ids: 字典ID列表
             pattern_names: 要使用的模式名称列表
+            include_match_details: 是否记录每个词条的匹配内容和匹配到的模式，为False时只保留匹配词条和统计数量，
+                导出分析结果依赖这些内容
+            parallel: 是否把各字典分发到多个进程并行分析，进程池不可用时改为依次分析
             
         Returns:
             Dict[int, Dict[str, Any]]: 字典ID到分析结果的映射
         """
         results = {}
+        # 已分析完成（无论成功与否）的字典，进程池出错时只需再分析其余的字典
+        finished = set()
+        # 同一批次的结果共用一个分析时间
+        analysis_time = datetime.now().isoformat()
+        
+        if parallel and len(dictionary_ids) > 1:
+            # 各字典之间没有共享状态，分发到多个进程并行分析
+            try:
+                max_workers = min(ANALYSIS_MAX_WORKERS, len(dictionary_ids))
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(_analyze_dictionary_worker, dictionary_id, pattern_names,
+                                        include_match_details, analysis_time): dictionary_id
+                        for dictionary_id in dictionary_ids
+                    }
+                    for future in as_completed(futures):
+                        dictionary_id = futures[future]
+                        try:
+                            self._collect_batch_result(results, dictionary_id, future.result())
+                        except _POOL_ERRORS:
+                            raise
+                        except Exception as e:
+                            logging.error(f"字典 {dictionary_id} 分析失败: {e}")
+                            results[dictionary_id] = {"error": str(e)}
+                        finished.add(dictionary_id)
+            except _POOL_ERRORS as e:
+                logging.warning(f"进程池不可用，改为依次分析: {e}")
         
         for dictionary_id in dictionary_ids:
+            if dictionary_id in finished:
+                continue
             try:
-                result = self.analyze_dictionary(dictionary_id, pattern_names)
-                if result:
-                    results[dictionary_id] = result
-                    logging.info(f"字典 {dictionary_id} 分析完成")
-                else:
-                    logging.warning(f"字典 {dictionary_id} 分析失败或无结果")
-                    
+                self._collect_batch_result(results, dictionary_id,
+                                           self.analyze_dictionary(dictionary_id, pattern_names,
+                                                                   include_match_details=include_match_details,
+                                                                   analysis_time=analysis_time))
             except Exception as e:
                 logging.error(f"字典 {dictionary_id} 分析失败: {e}")
                 results[dictionary_id] = {"error": str(e)}
+            finished.add(dictionary_id)
         
-        return results
+        # 按传入顺序返回
+        return {dictionary_id: results[dictionary_id] for dictionary_id in dictionary_ids if dictionary_id in results}
+    
+    def _collect_batch_result(self, results: Dict[int, Dict[str, Any]], dictionary_id: int,
+                              result: Dict[str, Any]):
+        """记录批量分析中单个字典的结果"""
+        if result:
+            results[dictionary_id] = result
+            logging.info(f"字典 {dictionary_id} 分析完成")
+        else:
+            logging.warning(f"字典 {dictionary_id} 分析失败或无结果")
     
     def create_tags_from_analysis(self, analysis_result: Dict[str, Any], dictionary_id: int = None) -> Dict[str, int]:
         """
@@ -240,7 +823,7 @@ class RegexAnalyzer:
             logging.error(f"根据分析结果创建标签失败: {e}")
             return {}
     
-    def _get_word_ids(self, dictionary_id: int, words: List[str]) -> List[int]:
+    def _get_word_ids(self, dictionary_id: int, words: List[str]) -> array:
         """
         获取词条的ID列表
         
@@ -249,24 +832,22 @@ class RegexAnalyzer:
             words: 词条列表
             
         Returns:
-            List[int]: 词条ID列表
+            array: 词条ID数组，以紧凑的64位整数存储
         """
         try:
             if not words:
-                return []
-            
-            placeholders = ','.join(['?'] * len(words))
-            query = f"""SELECT id FROM words 
-                       WHERE dictionary_id = ? AND word IN ({placeholders})"""
+                return array('q')
             
-            params = [dictionary_id] + words
-            rows = self.db.fetch_all(query, params)
+            query = """SELECT w.id FROM words w
+                       JOIN temp_values t ON w.word = t.value
+                       WHERE w.dictionary_id = ?"""
+            rows = self.db.fetch_all_with_values(query, words, (dictionary_id,))
             
-            return [row['id'] for row in rows]
+            return array('q', [row['id'] for row in rows])
             
         except Exception as e:
             logging.error(f"获取词条ID失败: {e}")
-            return []
+            return array('q')
     
     def export_analysis_result(self, analysis_result: Dict[str, Any], file_path: str, format: str = "json") -> bool:
         """
@@ -303,8 +884,19 @@ class RegexAnalyzer:
     def _export_json(self, analysis_result: Dict[str, Any], file_path: str) -> bool:
         """导出为JSON格式"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(analysis_result, file, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                # 逐个顶层键编码写入，不需要一次性生成整个结果的JSON文本
+                with open(file_path, 'wb') as file:
+                    file.write(b'{')
+                    for index, (key, value) in enumerate(analysis_result.items()):
+                        encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                                               default=dict)
+                        file.write(b',\n  ' if index else b'\n  ')
+                        file.write(orjson.dumps(key) + b': ' + encoded.replace(b'\n', b'\n  '))
+                    file.write(b'\n}' if analysis_result else b'}')
+            else:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    json.dump(analysis_result, file, ensure_ascii=False, indent=2, default=dict)
             
             logging.info(f"分析结果导出为JSON成功: {file_path}")
             return True
@@ -316,47 +908,51 @@ class RegexAnalyzer:
     def _export_txt(self, analysis_result: Dict[str, Any], file_path: str) -> bool:
         """导出为TXT格式"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write("=== 字典分析报告 ===\n\n")
-                
+            summary = analysis_result.get('summary', {})
+            pattern_results = analysis_result.get('pattern_results', {})
+            unmatched = analysis_result.get('unmatched_words', [])
+            
+            # 先拼好所有行再一次写入
+            lines = [
+                "=== 字典分析报告 ===\n\n",
                 # 基本信息
-                file.write(f"分析时间: {analysis_result.get('analysis_time', 'N/A')}\n")
-                file.write(f"总词条数: {analysis_result.get('total_words', 0)}\n")
-                file.write(f"使用模式: {', '.join(analysis_result.get('patterns_used', []))}\n\n")
-                
+                f"分析时间: {analysis_result.get('analysis_time', 'N/A')}\n",
+                f"总词条数: {analysis_result.get('total_words', 0)}\n",
+                f"使用模式: {', '.join(analysis_result.get('patterns_used', []))}\n\n",
                 # 汇总信息
-                summary = analysis_result.get('summary', {})
-                file.write("=== 分析汇总 ===\n")
-                file.write(f"匹配词条数: {summary.get('matched_words', 0)}\n")
-                file.write(f"总匹配次数: {summary.get('total_matches', 0)}\n")
-                file.write(f"未匹配词条数: {summary.get('unmatched_words', 0)}\n")
-                file.write(f"匹配率: {summary.get('match_rate', 0):.2f}%\n\n")
-                
+                "=== 分析汇总 ===\n",
+                f"匹配词条数: {summary.get('matched_words', 0)}\n",
+                f"总匹配次数: {summary.get('total_matches', 0)}\n",
+                f"未匹配词条数: {summary.get('unmatched_words', 0)}\n",
+                f"匹配率: {summary.get('match_rate', 0):.2f}%\n\n",
                 # 各模式详细结果
-                file.write("=== 模式分析详情 ===\n")
-                for pattern_name, pattern_result in analysis_result.get('pattern_results', {}).items():
-                    file.write(f"\n--- {pattern_name} ---\n")
-                    file.write(f"描述: {pattern_result.get('pattern_description', 'N/A')}\n")
-                    file.write(f"正则表达式: {pattern_result.get('pattern_regex', 'N/A')}\n")
-                    file.write(f"匹配词条数: {len(pattern_result.get('matched_words', []))}\n")
-                    file.write(f"匹配率: {pattern_result.get('match_rate', 0):.2f}%\n")
-                    
-                    matched_words = pattern_result.get('matched_words', [])
-                    if matched_words:
-                        file.write("匹配词条:\n")
-                        for word in matched_words[:20]:  # 只显示前20个
-                            file.write(f"  - {word}\n")
-                        if len(matched_words) > 20:
-                            file.write(f"  ... 还有 {len(matched_words) - 20} 个词条\n")
+                "=== 模式分析详情 ===\n"
+            ]
+            append = lines.append
+            
+            for pattern_name, pattern_result in pattern_results.items():
+                matched_words = pattern_result.get('matched_words', [])
+                append(f"\n--- {pattern_name} ---\n"
+                       f"描述: {pattern_result.get('pattern_description', 'N/A')}\n"
+                       f"正则表达式: {pattern_result.get('pattern_regex', 'N/A')}\n"
+                       f"匹配词条数: {len(matched_words)}\n"
+                       f"匹配率: {pattern_result.get('match_rate', 0):.2f}%\n")
                 
-                # 未匹配词条
-                unmatched = analysis_result.get('unmatched_words', [])
-                if unmatched:
-                    file.write(f"\n=== 未匹配词条 ({len(unmatched)} 个) ===\n")
-                    for word in unmatched[:50]:  # 只显示前50个
-                        file.write(f"  - {word}\n")
-                    if len(unmatched) > 50:
-                        file.write(f"  ... 还有 {len(unmatched) - 50} 个词条\n")
+                if matched_words:
+                    append("匹配词条:\n")
+                    lines.extend(f"  - {word}\n" for word in matched_words[:20])  # 只显示前20个
+                    if len(matched_words) > 20:
+                        append(f"  ... 还有 {len(matched_words) - 20} 个词条\n")
+            
+            # 未匹配词条
+            if unmatched:
+                append(f"\n=== 未匹配词条 ({len(unmatched)} 个) ===\n")
+                lines.extend(f"  - {word}\n" for word in unmatched[:50])  # 只显示前50个
+                if len(unmatched) > 50:
+                    append(f"  ... 还有 {len(unmatched) - 50} 个词条\n")
+            
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as file:
+                file.writelines(lines)
             
             logging.info(f"分析结果导出为TXT成功: {file_path}")
             return True
@@ -370,12 +966,13 @@ class RegexAnalyzer:
         try:
             import csv
             
-            with open(file_path, 'w', encoding='utf-8', newline='') as file:
-                writer = csv.writer(file)
-                
-                # 写入标题行
-                writer.writerow(['词条', '匹配模式', '匹配详情'])
-                
+            pattern_results = analysis_result.get('pattern_results', {})
+            match_details = {
+                pattern_name: pattern_result.get('match_details', {})
+                for pattern_name, pattern_result in pattern_results.items()
+            }
+            
+            def rows():
                 # 写入匹配的词条
                 for word, patterns in analysis_result.get('matched_words_detail', {}).items():
                     pattern_str = ', '.join(patterns)
@@ -383,17 +980,22 @@ class RegexAnalyzer:
                     # 获取匹配详情
                     details = []
                     for pattern_name in patterns:
-                        pattern_result = analysis_result.get('pattern_results', {}).get(pattern_name, {})
-                        word_matches = pattern_result.get('match_details', {}).get(word, [])
+                        word_matches = match_details.get(pattern_name, {}).get(word, [])
                         if word_matches:
                             details.append(f"{pattern_name}: {', '.join(word_matches)}")
                     
-                    detail_str = '; '.join(details)
-                    writer.writerow([word, pattern_str, detail_str])
+                    yield [word, pattern_str, '; '.join(details)]
                 
                 # 写入未匹配的词条
                 for word in analysis_result.get('unmatched_words', []):
-                    writer.writerow([word, '无匹配', ''])
+                    yield [word, '无匹配', '']
+            
+            with open(file_path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as file:
+                writer = csv.writer(file)
+                
+                # 写入标题行
+                writer.writerow(['词条', '匹配模式', '匹配详情'])
+                writer.writerows(rows())
             
             logging.info(f"分析结果导出为CSV成功: {file_path}")
             return True
@@ -476,27 +1078,22 @@ class DictionaryAnalyzer:
             字典统计信息
         """
         try:
-            cursor = self.db_manager.get_cursor()
-            
-            # 基本统计
-            cursor.execute("SELECT COUNT(*) FROM words WHERE dictionary_id = ?", (dictionary_id,))
-            total_words = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT word) FROM words WHERE dictionary_id = ?", (dictionary_id,))
-            unique_words = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT AVG(LENGTH(word)) FROM words WHERE dictionary_id = ?", (dictionary_id,))
-            avg_length = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT MIN(LENGTH(word)), MAX(LENGTH(word)) FROM words WHERE dictionary_id = ?", (dictionary_id,))
-            min_length, max_length = cursor.fetchone()
+            # 所有统计在一次扫描中完成
+            row = self.db_manager.fetch_one("""
+                SELECT COUNT(*) AS total_words,
+                       COUNT(DISTINCT word) AS unique_words,
+                       AVG(LENGTH(word)) AS avg_length,
+                       MIN(LENGTH(word)) AS min_length,
+                       MAX(LENGTH(word)) AS max_length
+                FROM words WHERE dictionary_id = ?
+            """, (dictionary_id,))
             
             return {
-                'total_words': total_words,
-                'unique_words': unique_words,
-                'avg_length': float(avg_length),
-                'min_length': min_length or 0,
-                'max_length': max_length or 0
+                'total_words': row['total_words'],
+                'unique_words': row['unique_words'],
+                'avg_length': float(row['avg_length'] or 0),
+                'min_length': row['min_length'] or 0,
+                'max_length': row['max_length'] or 0
             }
             
         except Exception as e:
@@ -509,6 +1106,24 @@ class DictionaryAnalyzer:
                 'max_length': 0
             }
 
+def _analyze_chunk_worker(words: List[str], pattern_names: List[str],
+                          include_match_details: bool) -> Dict[str, Dict[str, Any]]:
+    """
+    进程池任务：分析一块词条
+    
+    只传递模式名称，子进程使用自身regex_helper中编译好的模式，不需要序列化正则对象。
+    """
+    return analyzer._analyze_chunk(words, pattern_names, include_match_details)
+
+
+def _analyze_dictionary_worker(dictionary_id: int, pattern_names: List[str],
+                               include_match_details: bool, analysis_time: str) -> Dict[str, Any]:
+    """进程池任务：分析单个字典，已在子进程中运行，不再嵌套进程池"""
+    return analyzer.analyze_dictionary(dictionary_id, pattern_names, parallel=False,
+                                       include_match_details=include_match_details,
+                                       analysis_time=analysis_time)
+
+
 # 全局分析器实例
 analyzer = RegexAnalyzer()
 
@@ -5,9 +5,42 @@
 import logging
 import random
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import groupby, repeat
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
+from config.settings import ANALYSIS_MAX_WORKERS, TRANSFORM_PARALLEL_CHUNK_SIZE
+
+
+# 进程池无法启动子进程或子进程异常退出时抛出的错误，遇到时改为在当前进程中转换
+_POOL_ERRORS = (BrokenProcessPool, OSError)
+
+# 单词分隔符，以及把它们统一替换为空格的转换表，导入时构建一次供所有实例共用
+_WORD_SEPARATORS = (' ', '_', '-', '.', '/', '\\', ':', ';', '|')
+_SEPARATOR_TABLE = str.maketrans(dict.fromkeys(_WORD_SEPARATORS, ' '))
+
+# ASCII文本中的字母串，即random_word_case处理的单词
+_ASCII_LETTERS_RE = re.compile(r'([A-Za-z]+)')
+
+# ASCII文本中的第一个字母，first_letter_random只对它随机
+_ASCII_LETTER_RE = re.compile(r'[A-Za-z]')
+
+# 整串按位处理有固定开销，短文本逐字符处理更快
+_BULK_CASE_MIN_LENGTH = 10
+# 含分隔符的文本需要按字母串逐段放回，较长时整串处理才更快
+_BULK_ALTERNATING_MIN_LENGTH = 128
+# 小写ASCII字节中字母位置为0x20(大小写位)，其余为0
+_ASCII_CASE_BIT_TABLE = bytes(0x20 if ord('a') <= b <= ord('z') else 0 for b in range(256))
+
+
+@lru_cache(maxsize=None)
+def _random_byte_mask_table(threshold: int) -> bytes:
+    """随机字节小于threshold时映射为0x20，用于按概率选出要转大写的位置"""
+    return bytes(0x20 if b < threshold else 0 for b in range(256))
+
 
 class CaseStrategy(Enum):
     """大小写转换策略"""
@@ -27,7 +60,18 @@ class CaseTransformer:
     def __init__(self):
         """初始化转换器"""
         self.logger = logging.getLogger(__name__)
-        self.word_separators = [' ', '_', '-', '.', '/', '\\', ':', ';', '|']
+        self.word_separators = list(_WORD_SEPARATORS)
+        # 策略 -> 转换函数，每个函数从kwargs中取出自己需要的参数
+        self._strategy_handlers = {
+            CaseStrategy.RANDOM_CHAR: lambda text, kwargs: self.random_char_case(text, kwargs.get('probability', 0.5)),
+            CaseStrategy.RANDOM_WORD: lambda text, kwargs: self.random_word_case(text, kwargs.get('probability', 0.5)),
+            CaseStrategy.FIRST_LETTER: lambda text, kwargs: self.first_letter_random(text, kwargs.get('probability', 0.5)),
+            CaseStrategy.ALTERNATING: lambda text, kwargs: self.alternating_case(text, kwargs.get('start_upper', True)),
+            CaseStrategy.CAMEL_CASE: lambda text, kwargs: self.camel_case(text),
+            CaseStrategy.PASCAL_CASE: lambda text, kwargs: self.pascal_case(text),
+            CaseStrategy.SNAKE_CASE_UPPER: lambda text, kwargs: self.snake_case_upper(text),
+            CaseStrategy.KEBAB_CASE_UPPER: lambda text, kwargs: self.kebab_case_upper(text),
+        }
     
     def split_into_words(self, text: str) -> List[str]:
         """
@@ -39,9 +83,8 @@ class CaseTransformer:
         Returns:
             List[str]: 单词列表
         """
-        # 使用正则表达式分割单词
-        pattern = r'[' + re.escape(''.join(self.word_separators)) + r']+'
-        words = re.split(pattern, text)
+        # 只按空格分割，制表符等其他空白字符仍保留在单词中，与按分隔符分割的结果一致
+        words = text.translate(_SEPARATOR_TABLE).split(' ')
         return [word for word in words if word]
     
     def random_char_case(self, text: str, probability: float = 0.5) -> str:
@@ -55,6 +98,17 @@ class CaseTransformer:
         Returns:
             str: 转换后的文本
         """
+        # 较长的纯ASCII文本整串处理：每个字符取一个随机字节，字节小于probability*256时清除字母的大小写位。
+        # 只有probability*256为整数时这样取样才与逐字符random.random()的概率完全一致
+        threshold = probability * 256
+        if len(text) >= _BULK_CASE_MIN_LENGTH and text.isascii() and threshold == int(threshold):
+            lowered = text.lower().encode('ascii')
+            case_bits = lowered.translate(_ASCII_CASE_BIT_TABLE)
+            random_bytes = random.getrandbits(8 * len(lowered)).to_bytes(len(lowered), 'big')
+            upper_bits = random_bytes.translate(_random_byte_mask_table(int(threshold)))
+            flipped = int.from_bytes(lowered, 'big') ^ (int.from_bytes(case_bits, 'big') & int.from_bytes(upper_bits, 'big'))
+            return flipped.to_bytes(len(lowered), 'big').decode('ascii')
+        
         result = []
         for char in text:
             if char.isalpha():
@@ -77,6 +131,18 @@ class CaseTransformer:
         Returns:
             str: 转换后的文本
         """
+        # 整个文本就是一个单词
+        if text.isalpha():
+            return text.upper() if random.random() < probability else text.lower()
+        
+        # ASCII文本由正则在C层切分，切分结果的奇数位是单词，每个单词仍按顺序调用一次random.random()
+        if text.isascii():
+            parts = _ASCII_LETTERS_RE.split(text)
+            rand = random.random
+            for i in range(1, len(parts), 2):
+                parts[i] = parts[i].upper() if rand() < probability else parts[i].lower()
+            return ''.join(parts)
+        
         result = []
         i = 0
         
@@ -116,6 +182,16 @@ class CaseTransformer:
         if not text:
             return text
         
+        # ASCII文本只需找到第一个字母，随机一次后其余部分整体转小写
+        if text.isascii():
+            first_letter = _ASCII_LETTER_RE.search(text)
+            if first_letter is None:
+                return text
+            i = first_letter.start()
+            char = text[i].upper() if random.random() < probability else text[i].lower()
+            return text[:i] + char + text[i + 1:].lower()
+        
+        # 非ASCII文本整串lower()会改变结果(词尾Σ变ς，Ⅻ等非字母字符也会转小写)，逐字符处理
         result = []
         first_letter_processed = False
         
@@ -144,6 +220,28 @@ class CaseTransformer:
         Returns:
             str: 转换后的文本
         """
+        first = 0 if start_upper else 1
+        
+        # 纯ASCII字母：用切片赋值一次性把隔位字母转为大写
+        if text.isascii() and text.isalpha():
+            letters = bytearray(text.lower(), 'ascii')
+            letters[first::2] = letters[first::2].upper()
+            return letters.decode('ascii')
+        
+        # 较长的ASCII文本：把所有字母连成一串同样处理，再按原位置放回
+        if len(text) >= _BULK_ALTERNATING_MIN_LENGTH and text.isascii():
+            parts = _ASCII_LETTERS_RE.split(text.lower())
+            letters = bytearray(''.join(parts[1::2]), 'ascii')
+            letters[first::2] = letters[first::2].upper()
+            letters = letters.decode('ascii')
+            
+            position = 0
+            for i in range(1, len(parts), 2):
+                end = position + len(parts[i])
+                parts[i] = letters[position:end]
+                position = end
+            return ''.join(parts)
+        
         result = []
         should_upper = start_upper
         
@@ -238,36 +336,19 @@ class CaseTransformer:
             str: 转换后的文本
         """
         try:
-            if strategy == CaseStrategy.RANDOM_CHAR:
-                probability = kwargs.get('probability', 0.5)
-                return self.random_char_case(text, probability)
-            elif strategy == CaseStrategy.RANDOM_WORD:
-                probability = kwargs.get('probability', 0.5)
-                return self.random_word_case(text, probability)
-            elif strategy == CaseStrategy.FIRST_LETTER:
-                probability = kwargs.get('probability', 0.5)
-                return self.first_letter_random(text, probability)
-            elif strategy == CaseStrategy.ALTERNATING:
-                start_upper = kwargs.get('start_upper', True)
-                return self.alternating_case(text, start_upper)
-            elif strategy == CaseStrategy.CAMEL_CASE:
-                return self.camel_case(text)
-            elif strategy == CaseStrategy.PASCAL_CASE:
-                return self.pascal_case(text)
-            elif strategy == CaseStrategy.SNAKE_CASE_UPPER:
-                return self.snake_case_upper(text)
-            elif strategy == CaseStrategy.KEBAB_CASE_UPPER:
-                return self.kebab_case_upper(text)
-            else:
-                self.logger.warning(f"未知的转换策略: {strategy}")
+            handler = self._strategy_handlers.get(strategy)
+            if handler is None:
+                self.logger.warning("未知的转换策略: %s", strategy)
                 return text
+            return handler(text, kwargs)
                 
         except Exception as e:
-            self.logger.error(f"文本转换失败: {e}")
+            self.logger.error("文本转换失败: %s", e)
             return text
     
     def transform_word_list(self, words: List[str], strategy: CaseStrategy,
-                          keep_original: bool = True, **kwargs) -> List[str]:
+                          keep_original: bool = True, parallel: bool = False,
+                          **kwargs) -> List[str]:
         """
         转换词条列表
         
@@ -275,34 +356,49 @@ class CaseTransformer:
             words: 词条列表
             strategy: 转换策略
             keep_original: 是否保留原始词条
+            parallel: 是否分块交给多进程转换，只对大词表的随机策略生效；进程池不可用时改为在当前进程中转换
             **kwargs: 策略参数
             
         Returns:
             List[str]: 转换后的词条列表
         """
-        result = []
-        
-        if keep_original:
-            result.extend(words)
-        
-        # 检查是否是随机策略且需要生成多个变体
-        if strategy in [CaseStrategy.RANDOM_CHAR, CaseStrategy.RANDOM_WORD, CaseStrategy.FIRST_LETTER]:
+        # 用dict去重，保持词条首次出现的顺序
+        result = dict.fromkeys(words) if keep_original else {}
+        # 随机策略需要为每个词条生成多个变体
+        is_random = strategy in (CaseStrategy.RANDOM_CHAR, CaseStrategy.RANDOM_WORD, CaseStrategy.FIRST_LETTER)
+        
+        # 确定性策略每个词条只做一次转换，启动进程池和传递词条的开销大于并行节省的时间
+        if parallel and is_random and len(words) > TRANSFORM_PARALLEL_CHUNK_SIZE:
+            chunks = [words[i:i + TRANSFORM_PARALLEL_CHUNK_SIZE]
+                      for i in range(0, len(words), TRANSFORM_PARALLEL_CHUNK_SIZE)]
+            try:
+                # 子进程各自重新播种，避免fork出的进程生成相同的随机序列
+                with ProcessPoolExecutor(max_workers=ANALYSIS_MAX_WORKERS,
+                                         initializer=random.seed) as executor:
+                    # map按提交顺序返回，合并结果与串行转换的顺序一致
+                    for transformed in executor.map(_transform_word_list_worker, chunks,
+                                                    repeat(strategy), repeat(kwargs)):
+                        result.update(dict.fromkeys(transformed))
+                return list(result)
+            except _POOL_ERRORS as e:
+                self.logger.warning("进程池不可用，改为在当前进程中转换: %s", e)
+                # 丢弃已合并的部分结果，全部词条重新串行转换
+                result = dict.fromkeys(words) if keep_original else {}
+        
+        if is_random:
             variant_count = kwargs.get('variant_count', 5)
             
             for word in words:
-                variants = self.generate_random_variants(word, variant_count, strategy)
-                # 排除原始词条（如果已经包含在结果中）
-                for variant in variants:
-                    if variant != word or not keep_original:
-                        result.append(variant)
+                # 与原始词条相同的变体在保留原始词条时已经存在，重复写入不影响结果
+                result.update(dict.fromkeys(self.generate_random_variants(word, variant_count, strategy)))
         else:
             # 确定性策略，每个词条只生成一个变体
             for word in words:
                 transformed = self.transform_text(word, strategy, **kwargs)
                 if transformed != word:  # 只添加不同的变体
-                    result.append(transformed)
+                    result[transformed] = None
         
-        return list(set(result))  # 去重
+        return list(result)
     
     def generate_multiple_variants(self, text: str, strategies: List[CaseStrategy], 
                                  strategy_params: Optional[Dict[CaseStrategy, Dict]] = None) -> List[str]:
@@ -330,6 +426,41 @@ class CaseTransformer:
         
         return variants
     
+    def _count_possible_variants(self, text: str, strategy: CaseStrategy) -> int:
+        """
+        随机策略最多能生成多少种不同的变体
+        
+        每个可以改变大小写的单位(字符、单词或首字母)有大写和小写两种结果，
+        大小写相同的字母(如中文)只有一种结果。
+        
+        Args:
+            text: 输入文本
+            strategy: 随机策略
+            
+        Returns:
+            int: 变体数量上限
+        """
+        if text.isascii():
+            # ASCII字母都有大小写之分
+            if strategy == CaseStrategy.RANDOM_CHAR:
+                cased_count = sum(map(str.isalpha, text))
+            elif strategy == CaseStrategy.RANDOM_WORD:
+                cased_count = len(_ASCII_LETTERS_RE.findall(text))
+            else:
+                cased_count = 1 if _ASCII_LETTER_RE.search(text) else 0
+            # 超过2**32种时尝试次数先用完，不必精确
+            return 1 << min(cased_count, 32)
+        
+        if strategy == CaseStrategy.RANDOM_CHAR:
+            units = [char for char in text if char.isalpha()]
+        elif strategy == CaseStrategy.RANDOM_WORD:
+            units = [''.join(group) for is_alpha, group in groupby(text, str.isalpha) if is_alpha]
+        else:
+            units = [char for char in text if char.isalpha()][:1]
+        
+        cased_count = sum(1 for unit in units if unit.upper() != unit.lower())
+        return 1 << min(cased_count, 32)
+    
     def generate_random_variants(self, text: str, count: int = 5, 
                                strategy: CaseStrategy = CaseStrategy.RANDOM_CHAR) -> List[str]:
         """
@@ -345,28 +476,39 @@ class CaseTransformer:
         """
         variants = set([text])  # 使用集合避免重复
         
+        random_generators = {
+            CaseStrategy.RANDOM_CHAR: self.random_char_case,
+            CaseStrategy.RANDOM_WORD: self.random_word_case,
+            CaseStrategy.FIRST_LETTER: self.first_letter_random,
+        }
+        generate = random_generators.get(strategy)
+        if generate is None:
+            # 对于非随机策略，只生成一次
+            variants.add(self.transform_text(text, strategy))
+            return list(variants)
+        
+        # 所有可能的变体都出现后继续抽取不会再有新结果，短词条不必用满尝试次数
+        possible_count = self._count_possible_variants(text, strategy)
+        generated = set()
+        
         max_attempts = count * 10  # 最大尝试次数，避免无限循环
         attempts = 0
         
-        while len(variants) < count + 1 and attempts < max_attempts:
-            if strategy == CaseStrategy.RANDOM_CHAR:
-                variant = self.random_char_case(text)
-            elif strategy == CaseStrategy.RANDOM_WORD:
-                variant = self.random_word_case(text)
-            elif strategy == CaseStrategy.FIRST_LETTER:
-                variant = self.first_letter_random(text)
-            else:
-                # 对于非随机策略，只生成一次
-                variant = self.transform_text(text, strategy)
-                variants.add(variant)
-                break
-            
+        while len(variants) < count + 1 and attempts < max_attempts and len(generated) < possible_count:
+            variant = generate(text)
+            generated.add(variant)
             variants.add(variant)
             attempts += 1
         
         return list(variants)
 
 
+def _transform_word_list_worker(words: List[str], strategy: CaseStrategy,
+                                kwargs: Dict[str, Any]) -> List[str]:
+    """子进程入口：转换一块词条，只返回生成的变体"""
+    return case_transformer.transform_word_list(words, strategy, keep_original=False, **kwargs)
+
+
 # 全局大小写转换器实例
 case_transformer = CaseTransformer()
 
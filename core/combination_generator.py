@@ -4,13 +4,59 @@
 """
 import logging
 import json
-from typing import List, Dict, Any, Optional, Iterator
-from datetime import datetime, timedelta
-from itertools import product
+import calendar
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from datetime import datetime
+from functools import lru_cache
+from itertools import product, islice
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .database import db_manager
 
 
+# 月份(MM)和日期(DD)
+_MONTHS = tuple(f"{month:02d}" for month in range(1, 13))
+_DAYS = tuple(f"{day:02d}" for day in range(1, 32))
+# 闰年的所有月日(MMDD)，平年去掉0229
+_LEAP_YEAR_MMDD = tuple(
+    f"{month:02d}{day:02d}"
+    for month in range(1, 13)
+    for day in range(1, calendar.monthrange(2000, month)[1] + 1)
+)
+_COMMON_YEAR_MMDD = tuple(mmdd for mmdd in _LEAP_YEAR_MMDD if mmdd != "0229")
+
+
+@lru_cache(maxsize=128)
+def _parse_custom_input(input_text: str) -> Tuple[str, ...]:
+    """解析自定义输入，返回去重后的不可变结果以便缓存"""
+    if not input_text.strip():
+        return ()
+    
+    # 先按换行分割，再按逗号分割
+    items = []
+    for line in input_text.strip().split('\n'):
+        line = line.strip()
+        if line:
+            if ',' in line:
+                items.extend([item.strip() for item in line.split(',') if item.strip()])
+            else:
+                items.append(line)
+    
+    return tuple(set(items))  # 去重
+
+
+def _loads_config(config_data: str) -> Dict[str, Any]:
+    """解析保存的配置JSON，安装了orjson时用它解析"""
+    # orjson.JSONDecodeError是json.JSONDecodeError的子类，调用方按原样捕获
+    if orjson is not None:
+        return orjson.loads(config_data)
+    return json.loads(config_data)
+
+
 class CombinationGenerator:
     """组合模式字典生成器"""
     
@@ -18,6 +64,8 @@ class CombinationGenerator:
         """初始化组合生成器"""
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
+        # 字典ID组合 -> (字典版本, 不重复词条数)
+        self._word_count_cache: Dict[Tuple[int, ...], Tuple[Tuple[Any, int], int]] = {}
     
     def generate_date_range(self, start_year: int, end_year: int, date_format: str = "YYYY") -> List[str]:
         """
@@ -43,31 +91,18 @@ class CombinationGenerator:
                 dates.append(str(year)[-2:])
         elif date_format == "MM":
             # 月份格式
-            for month in range(1, 13):
-                dates.append(f"{month:02d}")
+            dates = list(_MONTHS)
         elif date_format == "DD":
             # 日期格式
-            for day in range(1, 32):
-                dates.append(f"{day:02d}")
+            dates = list(_DAYS)
         elif date_format == "YYYYMMDD":
-            # 完整日期格式
-            start_date = datetime(start_year, 1, 1)
-            end_date = datetime(end_year, 12, 31)
-            current_date = start_date
-            
-            while current_date <= end_date:
-                dates.append(current_date.strftime("%Y%m%d"))
-                current_date += timedelta(days=1)
+            # 完整日期格式，按年份拼接预先生成的月日
+            for year in range(start_year, end_year + 1):
+                month_days = _LEAP_YEAR_MMDD if calendar.isleap(year) else _COMMON_YEAR_MMDD
+                dates.extend(map(str(year).__add__, month_days))
         elif date_format == "MMDD":
-            # 月日格式
-            for month in range(1, 13):
-                for day in range(1, 32):
-                    try:
-                        # 验证日期有效性
-                        datetime(2000, month, day)
-                        dates.append(f"{month:02d}{day:02d}")
-                    except ValueError:
-                        continue
+            # 月日格式，包含0229
+            dates = list(_LEAP_YEAR_MMDD)
         
         return dates
     
@@ -95,20 +130,8 @@ class CombinationGenerator:
         Returns:
             List[str]: 解析后的字符串列表
         """
-        if not input_text.strip():
-            return []
-        
-        # 先按换行分割，再按逗号分割
-        items = []
-        for line in input_text.strip().split('\n'):
-            line = line.strip()
-            if line:
-                if ',' in line:
-                    items.extend([item.strip() for item in line.split(',') if item.strip()])
-                else:
-                    items.append(line)
-        
-        return list(set(items))  # 去重
+        # 估算和生成会对同一段输入各解析一次，解析结果按文本缓存
+        return list(_parse_custom_input(input_text))
     
     def get_dictionary_words(self, dictionary_ids: List[int]) -> List[str]:
         """
@@ -132,13 +155,59 @@ class CombinationGenerator:
                 ORDER BY word
             """
             
-            rows = self.db.fetch_all(query, dictionary_ids)
-            return [row['word'] for row in rows]
+            # 分批读取，按位置取列避免按列名查找
+            return [row[0] for row in self.db.iter_rows(query, tuple(dictionary_ids))]
             
         except Exception as e:
-            self.logger.error(f"获取字典词条失败: {e}")
+            self.logger.error("获取字典词条失败: %s", e)
             return []
     
+    def get_dictionary_word_count(self, dictionary_ids: List[int]) -> int:
+        """
+        获取字典中不重复词条的数量，与get_dictionary_words返回的列表长度一致
+        
+        结果按字典ID缓存，字典的更新时间或数量变化时重新统计。
+        
+        Args:
+            dictionary_ids: 字典ID列表
+            
+        Returns:
+            int: 不重复词条数量
+        """
+        if not dictionary_ids:
+            return 0
+        
+        try:
+            key = tuple(sorted(set(dictionary_ids)))
+            placeholders = ','.join(['?'] * len(key))
+            
+            # 增删词条都会更新字典的updated_at，用它判断缓存是否过期
+            version_row = self.db.fetch_one(
+                f"SELECT MAX(updated_at) AS last_update, COUNT(*) AS dictionary_count "
+                f"FROM dictionaries WHERE id IN ({placeholders})",
+                key
+            )
+            version = (version_row['last_update'], version_row['dictionary_count'])
+            
+            cached = self._word_count_cache.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            
+            row = self.db.fetch_one(
+                f"SELECT COUNT(DISTINCT word) AS word_count FROM words WHERE dictionary_id IN ({placeholders})",
+                key
+            )
+            word_count = row['word_count']
+            
+            if len(self._word_count_cache) >= 256:
+                self._word_count_cache.clear()
+            self._word_count_cache[key] = (version, word_count)
+            return word_count
+            
+        except Exception as e:
+            self.logger.error("获取字典词条数量失败: %s", e)
+            return 0
+    
     def generate_combinations(self, config: Dict[str, Any]) -> Iterator[str]:
         """
         生成组合字典
@@ -205,20 +274,50 @@ class CombinationGenerator:
                 self.logger.warning("没有有效的区域数据")
                 return
             
-            # 生成笛卡尔积组合
+            # 生成笛卡尔积组合，连接符为空时connector.join即''.join，由map在C层逐个拼接
+            # 按区域数量exec生成嵌套循环的生成器实测不比product快，拼接留在C层即可
             area_keys = sorted(valid_areas.keys())
-            area_values = [valid_areas[key] for key in area_keys]
+            area_values = [tuple(valid_areas[key]) for key in area_keys]
             
-            for combination in product(*area_values):
-                if connector:
-                    yield connector.join(combination)
-                else:
-                    yield ''.join(combination)
+            if len(area_values) == 1:
+                # 只有一个区域时组合就是该区域的内容本身
+                yield from area_values[0]
+                return
+            
+            yield from map(connector.join, product(*area_values))
                     
         except Exception as e:
-            self.logger.error(f"生成组合失败: {e}")
+            self.logger.error("生成组合失败: %s", e)
             return
     
+    def write_combinations(self, config: Dict[str, Any], path: str, encoding: str = 'utf-8') -> int:
+        """
+        把组合逐行写入文件，不在内存中保留组合列表
+        
+        Args:
+            config: 组合配置，格式同generate_combinations
+            path: 输出文件路径
+            encoding: 文件编码
+        
+        Returns:
+            int: 写入的组合数量
+        """
+        count = 0
+        with open(path, 'wb', buffering=1 << 20) as f:
+            # 编码后的行先攒在bytearray里，约64KB写一次
+            buffer = bytearray()
+            for combination in self.generate_combinations(config):
+                buffer += combination.encode(encoding)
+                buffer += b'\n'
+                count += 1
+                if len(buffer) > 65536:
+                    f.write(buffer)
+                    buffer.clear()
+            f.write(buffer)
+        
+        self.logger.info("组合已写入文件: %s, 共 %s 个", path, count)
+        return count
+    
     def save_combination_config(self, name: str, config: Dict[str, Any]) -> int:
         """
         保存组合配置
@@ -232,19 +331,20 @@ class CombinationGenerator:
         """
         try:
             config_json = json.dumps(config, ensure_ascii=False)
+            now = datetime.now()
             
             cursor = self.db.execute_query(
                 """INSERT INTO combination_configs (name, config_data, created_at, updated_at)
                    VALUES (?, ?, ?, ?)""",
-                (name, config_json, datetime.now(), datetime.now())
+                (name, config_json, now, now)
             )
             
             config_id = cursor.lastrowid
-            self.logger.info(f"保存组合配置成功: {name} (ID: {config_id})")
+            self.logger.info("保存组合配置成功: %s (ID: %s)", name, config_id)
             return config_id
             
         except Exception as e:
-            self.logger.error(f"保存组合配置失败: {e}")
+            self.logger.error("保存组合配置失败: %s", e)
             raise
     
     def load_combination_config(self, config_id: int) -> Optional[Dict[str, Any]]:
@@ -264,7 +364,7 @@ class CombinationGenerator:
             )
             
             if row:
-                config = json.loads(row['config_data'])
+                config = _loads_config(row['config_data'])
                 return {
                     'id': row['id'],
                     'name': row['name'],
@@ -276,7 +376,7 @@ class CombinationGenerator:
             return None
             
         except Exception as e:
-            self.logger.error(f"加载组合配置失败: {e}")
+            self.logger.error("加载组合配置失败: %s", e)
             return None
     
     def get_all_combination_configs(self) -> List[Dict[str, Any]]:
@@ -294,7 +394,7 @@ class CombinationGenerator:
             configs = []
             for row in rows:
                 try:
-                    config = json.loads(row['config_data'])
+                    config = _loads_config(row['config_data'])
                     configs.append({
                         'id': row['id'],
                         'name': row['name'],
@@ -303,13 +403,13 @@ class CombinationGenerator:
                         'updated_at': row['updated_at']
                     })
                 except json.JSONDecodeError:
-                    self.logger.warning(f"配置数据解析失败: ID {row['id']}")
+                    self.logger.warning("配置数据解析失败: ID %s", row['id'])
                     continue
             
             return configs
             
         except Exception as e:
-            self.logger.error(f"获取组合配置列表失败: {e}")
+            self.logger.error("获取组合配置列表失败: %s", e)
             return []
     
     def delete_combination_config(self, config_id: int) -> bool:
@@ -330,12 +430,12 @@ class CombinationGenerator:
             
             success = cursor.rowcount > 0
             if success:
-                self.logger.info(f"删除组合配置成功: ID {config_id}")
+                self.logger.info("删除组合配置成功: ID %s", config_id)
             
             return success
             
         except Exception as e:
-            self.logger.error(f"删除组合配置失败: {e}")
+            self.logger.error("删除组合配置失败: %s", e)
             return False
     
     def estimate_combination_count(self, config: Dict[str, Any]) -> int:
@@ -367,7 +467,7 @@ class CombinationGenerator:
                     area_count = 1 if area_config['data'] else 0
                 elif area_config['type'] == 'dictionary':
                     dictionary_ids = area_config['data']
-                    area_count = len(self.get_dictionary_words(dictionary_ids))
+                    area_count = self.get_dictionary_word_count(dictionary_ids)
                 elif area_config['type'] == 'date':
                     date_config = area_config['data']
                     date_list = self.generate_date_range(
@@ -388,7 +488,7 @@ class CombinationGenerator:
             return total_count
             
         except Exception as e:
-            self.logger.error(f"估算组合数量失败: {e}")
+            self.logger.error("估算组合数量失败: %s", e)
             return 0
 
 
@@ -413,9 +513,10 @@ if __name__ == "__main__":
     count = combination_generator.estimate_combination_count(test_config)
     print(f"估算组合数量: {count}")
     
-    # 生成组合（限制输出数量）
-    combinations = list(combination_generator.generate_combinations(test_config))
-    print(f"实际生成数量: {len(combinations)}")
+    # 生成组合（限制输出数量），逐个消费而不是整体载入列表
     print("前10个组合:")
-    for i, combo in enumerate(combinations[:10]):
-        print(f"  {i+1}: {combo}")
\ No newline at end of file
+    for i, combo in enumerate(islice(combination_generator.generate_combinations(test_config), 10)):
+        print(f"  {i+1}: {combo}")
+    
+    generated_count = sum(1 for _ in combination_generator.generate_combinations(test_config))
+    print(f"实际生成数量: {generated_count}")
\ No newline at end of file
@@ -2,13 +2,48 @@
 数据库管理模块
 负责SQLite数据库的创建、连接和基础操作
 """
+import os
+import re
+import shutil
 import sqlite3
+import tempfile
 import logging
+import threading
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable, BinaryIO
 from datetime import datetime
 
-from config.settings import DATABASE_PATH
+from config.settings import DATABASE_PATH, CHUNK_SIZE
+
+
+# 每个新连接都要设置的PRAGMA，日志模式(WAL)写在数据库文件里，只需设置一次
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# 每个连接缓存的预编译语句数量，sqlite3默认只有128条
+_STATEMENT_CACHE_SIZE = 512
+
+# 可以交给只读连接执行的查询
+_READ_ONLY_QUERY_RE = re.compile(r'\s*(SELECT|PRAGMA\s+table_info)\b', re.IGNORECASE)
+
+# 在线备份时每一步复制的页面数
+_BACKUP_PAGES_PER_STEP = 1000
+
+# 统计各表记录数和最后更新时间，一条语句完成
+_DATABASE_STATS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM dictionaries) AS dictionaries_count,
+        (SELECT COUNT(*) FROM words) AS words_count,
+        (SELECT COUNT(*) FROM tags) AS tags_count,
+        (SELECT COUNT(*) FROM word_tags) AS word_tags_count,
+        (SELECT MAX(updated_at) FROM dictionaries) AS last_update
+"""
 
 
 class DatabaseManager:
@@ -22,6 +57,10 @@ class DatabaseManager:
             db_path: 数据库文件路径，默认使用配置中的路径
         """
         self.db_path = db_path or DATABASE_PATH
+        self._wal_enabled = False
+        self._local = threading.local()
+        # 数据库恢复时加一，各线程在此之前打开的连接在下次取用时关闭并重新创建
+        self._generation = 0
         self._ensure_database_exists()
         
     def _ensure_database_exists(self):
@@ -31,19 +70,173 @@ class DatabaseManager:
         
     def get_connection(self) -> sqlite3.Connection:
         """
-        获取数据库连接 - 每次调用都创建新连接以避免线程问题
+        获取数据库连接 - 每个线程复用自己的连接，不跨线程共享
         
         Returns:
             sqlite3.Connection: 数据库连接对象
         """
-        # 每次都创建新连接，避免跨线程使用同一连接的问题
-        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection = self._cached_connection('connection', 'pid', 'generation')
+        if connection is not None:
+            return connection
+        
+        connection = sqlite3.connect(self.db_path, check_same_thread=False,
+                                     cached_statements=_STATEMENT_CACHE_SIZE)
         connection.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+        
+        # WAL模式下提交不必每次fsync，读写也不再互相阻塞
+        if not self._wal_enabled:
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        for pragma in _CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        self._local.generation = self._generation
+        return connection
+    
+    def get_read_connection(self) -> sqlite3.Connection:
+        """
+        获取只读数据库连接 - 每个线程复用自己的只读连接，用于事务之外的查询
+        
+        只读连接不会取得写锁，WAL模式下其他线程写入时也能并发读取。每个线程各有一个只读连接和
+        一个读写连接，相当于按线程划分的连接池，取用时不必加锁排队。数据库文件还不存在时返回读写连接。
+        恢复数据库后，各线程的连接都在下次取用时重新创建。
+        
+        Returns:
+            sqlite3.Connection: 数据库连接对象
+        """
+        connection = self._cached_connection('read_connection', 'read_pid', 'read_generation')
+        if connection is not None:
+            return connection
+        
+        if not Path(self.db_path).exists():
+            return self.get_connection()
+        
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                     cached_statements=_STATEMENT_CACHE_SIZE)
+        connection.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        
+        self._local.read_connection = connection
+        self._local.read_pid = os.getpid()
+        self._local.read_generation = self._generation
+        return connection
+    
+    def _cached_connection(self, attribute: str, pid_attribute: str,
+                           generation_attribute: str) -> Optional[sqlite3.Connection]:
+        """
+        取当前线程已打开、仍可继续使用的连接，没有时返回None
+        
+        fork出的子进程会继承父进程的连接，SQLite连接不能跨进程使用，需要重新创建。
+        恢复数据库之前打开的连接由所属线程在这里关闭，但不打断该线程正在进行的事务。
+        """
+        connection = getattr(self._local, attribute, None)
+        if connection is None or getattr(self._local, pid_attribute) != os.getpid():
+            return None
+        
+        if getattr(self._local, generation_attribute) != self._generation and not self._in_explicit_transaction():
+            connection.close()
+            setattr(self._local, attribute, None)
+            return None
+        
         return connection
     
+    def _connection_for(self, query: str) -> sqlite3.Connection:
+        """
+        选择执行查询的连接：事务之外的只读查询使用只读连接，其余使用读写连接
+        
+        事务中的查询必须使用读写连接，才能看到事务内尚未提交的修改。
+        """
+        if not self._in_explicit_transaction() and _READ_ONLY_QUERY_RE.match(query):
+            return self.get_read_connection()
+        return self.get_connection()
+    
     def close(self):
-        """关闭数据库连接 - 由于每次都创建新连接，这个方法现在主要用于兼容性"""
-        pass
+        """关闭当前线程的数据库连接，下次使用时会重新创建；其他线程的连接不受影响"""
+        for attribute, pid_attribute in (('connection', 'pid'), ('read_connection', 'read_pid')):
+            connection = getattr(self._local, attribute, None)
+            if connection is None:
+                continue
+            if getattr(self._local, pid_attribute) == os.getpid():
+                connection.close()
+            setattr(self._local, attribute, None)
+    
+    def _in_explicit_transaction(self) -> bool:
+        """当前线程是否处于transaction()开启的事务中"""
+        return getattr(self._local, 'transaction_active', False)
+    
+    def _end_read(self, conn: sqlite3.Connection):
+        """
+        丢弃读操作中未提交的修改，与关闭连接时的行为一致，避免连接上残留事务
+        
+        事务之外的读操作结束后连接上不保留事务，需要多条语句看到同一份数据时应使用transaction()。
+        """
+        if conn.in_transaction and not self._in_explicit_transaction():
+            conn.rollback()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        在一个写事务中执行多条语句，退出时统一提交，出错时整体回滚
+        
+        事务内execute_query和execute_many不再单独提交。已在事务中时直接加入外层事务。
+        
+        Yields:
+            sqlite3.Connection: 当前线程的数据库连接
+        """
+        conn = self.get_connection()
+        if self._in_explicit_transaction():
+            yield conn
+            return
+        
+        # IMMEDIATE在开始时就取得写锁，避免事务中途因锁升级失败
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.transaction_active = True
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.transaction_active = False
+    
+    @contextmanager
+    def suspended_indexes(self, index_names: Iterable[str]) -> Iterator[sqlite3.Connection]:
+        """
+        在一个事务中暂时删除指定索引，正常退出时按原定义重建
+        
+        大批量删除时逐行维护索引的开销比删除后一次性重建更大。出错时事务回滚，删除的索引随之恢复。
+        
+        Args:
+            index_names: 要暂时删除的索引名称
+            
+        Yields:
+            sqlite3.Connection: 当前线程的数据库连接
+        """
+        with self.transaction() as conn:
+            names = list(index_names)
+            if not names:
+                yield conn
+                return
+            
+            placeholders = ','.join(['?'] * len(names))
+            definitions = conn.execute(
+                f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name IN ({placeholders})",
+                names
+            ).fetchall()
+            
+            for name, _ in definitions:
+                conn.execute(f'DROP INDEX "{name}"')
+            
+            yield conn
+            
+            for _, sql in definitions:
+                conn.execute(sql)
     
     def create_tables(self):
         """创建数据库表"""
@@ -58,7 +251,8 @@ class DatabaseManager:
                     name TEXT NOT NULL UNIQUE,
                     description TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    word_count INTEGER NOT NULL DEFAULT 0
                 )
             ''')
             
@@ -135,6 +329,9 @@ class DatabaseManager:
                 )
             ''')
             
+            # 为旧版本数据库补充新增的列
+            self._migrate_columns(cursor)
+            
             # 创建索引以优化查询性能
             self._create_indexes(cursor)
             
@@ -146,13 +343,29 @@ class DatabaseManager:
             logging.error(f"创建数据库表失败: {e}")
             raise
     
+    def _migrate_columns(self, cursor: sqlite3.Cursor):
+        """为旧版本数据库补充新增的列"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(dictionaries)")}
+        
+        # 字典的词条数量随增删词条同步维护，列出字典时不必再连接词条表计数
+        if 'word_count' not in columns:
+            cursor.execute("ALTER TABLE dictionaries ADD COLUMN word_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("""
+                UPDATE dictionaries SET word_count = (
+                    SELECT COUNT(*) FROM words WHERE words.dictionary_id = dictionaries.id
+                )
+            """)
+    
     def _create_indexes(self, cursor: sqlite3.Cursor):
         """创建数据库索引"""
         indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_words_dictionary_id ON words(dictionary_id)",
             "CREATE INDEX IF NOT EXISTS idx_words_word ON words(word)",
-            "CREATE INDEX IF NOT EXISTS idx_word_tags_word_id ON word_tags(word_id)",
-            "CREATE INDEX IF NOT EXISTS idx_word_tags_tag_id ON word_tags(tag_id)",
+            "CREATE INDEX IF NOT EXISTS idx_words_dictionary_word ON words(dictionary_id, word)",
+            "CREATE INDEX IF NOT EXISTS idx_words_dict_word_lower ON words(dictionary_id, lower(word))",
+            # 按字典分页列出词条时按ID排序，直接沿索引顺序读取，不必对整个字典分组排序
+            "CREATE INDEX IF NOT EXISTS idx_words_dict_id ON words(dictionary_id, id)",
+            # 按标签查词条时覆盖词条ID，不必回表；按词条查标签使用word_tags的主键
+            "CREATE INDEX IF NOT EXISTS idx_word_tags_tag_word ON word_tags(tag_id, word_id)",
             "CREATE INDEX IF NOT EXISTS idx_dictionaries_name ON dictionaries(name)",
             "CREATE INDEX IF NOT EXISTS idx_url_analysis_dictionary_id ON url_analysis(dictionary_id)",
             "CREATE INDEX IF NOT EXISTS idx_url_analysis_has_params ON url_analysis(has_params)",
@@ -163,6 +376,12 @@ class DatabaseManager:
         
         for index_sql in indexes:
             cursor.execute(index_sql)
+        
+        # 以下索引已被上面的复合索引或主键覆盖，只会拖慢写入
+        for redundant_index in ('idx_words_dictionary_id', 'idx_word_tags_word_id', 'idx_word_tags_tag_id'):
+            cursor.execute(f"DROP INDEX IF EXISTS {redundant_index}")
+        # 让查询规划器按需更新统计信息，以便选用上面的复合索引
+        cursor.execute("PRAGMA optimize")
     
     def execute_query(self, query: str, params: Tuple = ()) -> sqlite3.Cursor:
         """
@@ -180,14 +399,14 @@ class DatabaseManager:
         
         try:
             cursor.execute(query, params)
-            conn.commit()
+            if not self._in_explicit_transaction():
+                conn.commit()
             return cursor
         except sqlite3.Error as e:
-            conn.rollback()
+            if not self._in_explicit_transaction():
+                conn.rollback()
             logging.error(f"执行查询失败: {query}, 错误: {e}")
             raise
-        finally:
-            conn.close()
     
     def fetch_all(self, query: str, params: Tuple = ()) -> List[sqlite3.Row]:
         """
@@ -200,7 +419,7 @@ class DatabaseManager:
         Returns:
             List[sqlite3.Row]: 查询结果列表
         """
-        conn = self.get_connection()
+        conn = self._connection_for(query)
         cursor = conn.cursor()
         
         try:
@@ -210,7 +429,7 @@ class DatabaseManager:
             logging.error(f"执行查询失败: {query}, 错误: {e}")
             raise
         finally:
-            conn.close()
+            self._end_read(conn)
     
     def fetch_one(self, query: str, params: Tuple = ()) -> Optional[sqlite3.Row]:
         """
@@ -223,7 +442,7 @@ class DatabaseManager:
         Returns:
             Optional[sqlite3.Row]: 查询结果，如果没有结果则返回None
         """
-        conn = self.get_connection()
+        conn = self._connection_for(query)
         cursor = conn.cursor()
         
         try:
@@ -233,9 +452,136 @@ class DatabaseManager:
             logging.error(f"执行查询失败: {query}, 错误: {e}")
             raise
         finally:
-            conn.close()
+            self._end_read(conn)
+    
+    def iter_rows(self, query: str, params: Tuple = (), arraysize: int = CHUNK_SIZE) -> Iterator[sqlite3.Row]:
+        """
+        执行查询并分批读取结果，不会一次性把全部结果载入内存
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            arraysize: 每批读取的行数
+            
+        Yields:
+            sqlite3.Row: 查询结果行
+        """
+        conn = self._connection_for(query)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                yield from rows
+        except sqlite3.Error as e:
+            logging.error(f"执行查询失败: {query}, 错误: {e}")
+            raise
+        finally:
+            cursor.close()
+            self._end_read(conn)
     
-    def execute_many(self, query: str, params_list: List[Tuple]) -> int:
+    def iter_batches(self, query: str, params: Tuple = (), arraysize: int = CHUNK_SIZE) -> Iterator[List[Tuple]]:
+        """
+        执行查询并逐批返回结果，每行是普通元组
+        
+        与iter_rows相同，但不为每一行创建sqlite3.Row，适合只按位置读取列的大批量导出。
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            arraysize: 每批读取的行数
+            
+        Yields:
+            List[Tuple]: 一批查询结果行
+        """
+        conn = self._connection_for(query)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                yield rows
+        except sqlite3.Error as e:
+            logging.error(f"执行查询失败: {query}, 错误: {e}")
+            raise
+        finally:
+            cursor.close()
+            self._end_read(conn)
+    
+    def fetch_all_with_values(self, query: str, values: Iterable[Any], params: Tuple = ()) -> List[sqlite3.Row]:
+        """
+        将一组值写入临时表 temp_values(value) 后执行查询并返回所有结果
+        
+        用于代替 IN (?, ?, ...) 形式的超长参数列表，查询中与 temp_values 连接即可，
+        参数个数不受SQLite变量数上限的限制。临时表属于各连接自己的临时库，
+        事务之外同其他查询一样使用只读连接。
+        
+        Args:
+            query: SQL查询语句，可以引用临时表 temp_values
+            values: 写入临时表的值
+            params: 查询参数
+            
+        Returns:
+            List[sqlite3.Row]: 查询结果列表
+        """
+        conn = self._connection_for(query)
+        cursor = conn.cursor()
+        
+        try:
+            self._fill_temp_values(cursor, values)
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"执行查询失败: {query}, 错误: {e}")
+            raise
+        finally:
+            self._end_read(conn)
+    
+    def execute_with_values(self, query: str, values: Iterable[Any], params: Tuple = ()) -> sqlite3.Cursor:
+        """
+        将一组值写入临时表 temp_values(value) 后执行SQL语句，用法同fetch_all_with_values
+        
+        如 DELETE FROM words WHERE id IN (SELECT value FROM temp_values)，
+        语句文本固定，可以命中语句缓存，也不受SQLite变量数上限的限制。
+        
+        Args:
+            query: SQL语句，可以引用临时表 temp_values
+            values: 写入临时表的值
+            params: 语句参数
+            
+        Returns:
+            sqlite3.Cursor: 执行结果游标
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._fill_temp_values(cursor, values)
+            cursor.execute(query, params)
+            if not self._in_explicit_transaction():
+                conn.commit()
+            return cursor
+        except sqlite3.Error as e:
+            if not self._in_explicit_transaction():
+                conn.rollback()
+            logging.error(f"执行查询失败: {query}, 错误: {e}")
+            raise
+    
+    def _fill_temp_values(self, cursor: sqlite3.Cursor, values: Iterable[Any]):
+        """清空临时表 temp_values 并写入一组值"""
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS temp_values (value PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp_values")
+        # zip把每个值包成单元素元组，不经过Python生成器
+        cursor.executemany("INSERT OR IGNORE INTO temp_values (value) VALUES (?)", zip(values))
+    
+    def execute_many(self, query: str, params_list: Iterable[Tuple]) -> int:
         """
         批量执行SQL语句
         
@@ -246,19 +592,37 @@ class DatabaseManager:
         Returns:
             int: 影响的行数
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return self.execute_many_chunked(query, params_list)
+    
+    def execute_many_chunked(self, query: str, params_iter: Iterable[Tuple],
+                             chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        在一个事务中分批执行SQL语句，参数可以是生成器，每次只取出chunk_size组
+        
+        Args:
+            query: SQL语句
+            params_iter: 参数序列
+            chunk_size: 每批执行的参数组数
+            
+        Returns:
+            int: 影响的行数
+        """
+        params_iter = iter(params_iter)
+        total_rowcount = 0
         
         try:
-            cursor.executemany(query, params_list)
-            conn.commit()
-            return cursor.rowcount
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                while True:
+                    chunk = list(islice(params_iter, chunk_size))
+                    if not chunk:
+                        break
+                    cursor.executemany(query, chunk)
+                    total_rowcount += cursor.rowcount
+            return total_rowcount
         except sqlite3.Error as e:
-            conn.rollback()
             logging.error(f"批量执行失败: {query}, 错误: {e}")
             raise
-        finally:
-            conn.close()
     
     def get_table_info(self, table_name: str) -> List[Dict[str, Any]]:
         """
@@ -289,12 +653,13 @@ class DatabaseManager:
             backup_dir = Path(backup_path).parent
             backup_dir.mkdir(parents=True, exist_ok=True)
             
-            # 创建备份连接
-            backup_conn = sqlite3.connect(backup_path)
+            # 创建备份连接，备份文件是整体写入的副本，不需要回滚日志
+            backup_conn = sqlite3.connect(backup_path, isolation_level=None)
+            backup_conn.execute("PRAGMA journal_mode=OFF")
             
-            # 执行备份
+            # 执行备份，每次复制一部分页面，期间释放源数据库的锁，不会长时间阻塞写入
             with self.get_connection() as source_conn:
-                source_conn.backup(backup_conn)
+                source_conn.backup(backup_conn, pages=_BACKUP_PAGES_PER_STEP)
             
             backup_conn.close()
             logging.info(f"数据库备份成功: {backup_path}")
@@ -326,10 +691,20 @@ class DatabaseManager:
             backup_conn = sqlite3.connect(backup_path)
             
             # 恢复数据库
-            with sqlite3.connect(self.db_path) as target_conn:
-                backup_conn.backup(target_conn)
+            try:
+                target_conn = sqlite3.connect(self.db_path)
+                try:
+                    backup_conn.backup(target_conn)
+                finally:
+                    target_conn.close()
+            finally:
+                backup_conn.close()
+                # 其他线程在恢复之前打开的连接下次取用时重新创建，新连接重新开启WAL模式
+                self._generation += 1
+                self._wal_enabled = False
             
-            backup_conn.close()
+            # 备份可能来自旧版本，补齐表结构
+            self.create_tables()
             logging.info(f"数据库恢复成功: {backup_path}")
             return True
             
@@ -337,6 +712,35 @@ class DatabaseManager:
             logging.error(f"数据库恢复失败: {e}")
             return False
     
+    def restore_from_stream(self, source: BinaryIO) -> bool:
+        """
+        从以二进制方式读取的文件对象（如压缩包中的数据库）恢复数据库
+        
+        SQLite只能从文件恢复，先写入数据库所在目录的临时文件，再由restore_database经备份接口写入当前数据库。
+        不直接覆盖数据库文件，其他线程的连接和WAL文件仍在使用它。临时文件无论恢复成功与否都会删除。
+        
+        Args:
+            source: 数据库内容
+            
+        Returns:
+            bool: 恢复是否成功
+        """
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=Path(self.db_path).parent, suffix='.restore',
+                                             delete=False) as temp_file:
+                temp_path = temp_file.name
+                shutil.copyfileobj(source, temp_file)
+            
+            return self.restore_database(temp_path)
+            
+        except Exception as e:
+            logging.error(f"数据库恢复失败: {e}")
+            return False
+        finally:
+            if temp_path is not None:
+                Path(temp_path).unlink(missing_ok=True)
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """
         获取数据库统计信息
@@ -347,12 +751,15 @@ class DatabaseManager:
         stats = {}
         
         try:
+            # 一次查询取回全部统计值，按列的位置解包
+            (dictionaries_count, words_count, tags_count,
+             word_tags_count, last_update) = self.fetch_one(_DATABASE_STATS_QUERY)
+            
             # 获取各表的记录数
-            tables = ['dictionaries', 'words', 'tags', 'word_tags']
-            for table in tables:
-                count_query = f"SELECT COUNT(*) as count FROM {table}"
-                result = self.fetch_one(count_query)
-                stats[f"{table}_count"] = result['count'] if result else 0
+            stats['dictionaries_count'] = dictionaries_count
+            stats['words_count'] = words_count
+            stats['tags_count'] = tags_count
+            stats['word_tags_count'] = word_tags_count
             
             # 获取数据库文件大小
             if Path(self.db_path).exists():
@@ -361,12 +768,7 @@ class DatabaseManager:
                 stats['database_size'] = 0
             
             # 获取最后更新时间
-            last_update_query = """
-                SELECT MAX(updated_at) as last_update 
-                FROM dictionaries
-            """
-            result = self.fetch_one(last_update_query)
-            stats['last_update'] = result['last_update'] if result and result['last_update'] else None
+            stats['last_update'] = last_update if last_update else None
             
         except Exception as e:
             logging.error(f"获取数据库统计信息失败: {e}")
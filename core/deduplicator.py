@@ -2,15 +2,178 @@
 去重功能模块
 提供多种去重策略，包括精确匹配、忽略大小写、相似度匹配等
 """
+import copy
+import hashlib
 import logging
+import math
 import re
-from typing import List, Dict, Set, Callable, Tuple, Any
+import sqlite3
+from array import array
+from datetime import datetime
+from typing import List, Dict, Set, Callable, Tuple, Any, Optional, Iterator
+from bisect import bisect_left, bisect_right
 from difflib import SequenceMatcher
 from collections import defaultdict, Counter
+from itertools import chain
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
 
 from .database import db_manager
-from config.settings import SIMILARITY_THRESHOLD, DEFAULT_DEDUP_STRATEGY
+from config.settings import (
+    SIMILARITY_THRESHOLD, DEFAULT_DEDUP_STRATEGY, DEDUP_ANALYSIS_CACHE_SIZE, DEDUP_INDEX_REBUILD_RATIO,
+    DEDUP_INDEX_REBUILD_MIN_COUNT
+)
+
+
+# 按ID删除词条和刷新字典的更新时间、词条数量，SQL文本固定以便命中连接的语句缓存
+_TOUCH_DICTIONARY_SQL = "UPDATE dictionaries SET updated_at = ?, word_count = word_count - ? WHERE id = ?"
+_DELETE_WORDS_BY_ID_SQL = "DELETE FROM words WHERE id IN (SELECT value FROM temp_values)"
+
+# 可以直接在SQL中完成的去重：按分组键删除每组中最早添加的词条以外的词条，键为分组表达式
+_DELETE_DUPLICATES_SQL = {
+    group_key: f"""
+        DELETE FROM words
+        WHERE dictionary_id = ? AND id NOT IN (
+            SELECT MIN(id) FROM words WHERE dictionary_id = ? GROUP BY {group_key}
+        )
+    """
+    for group_key in ('word', 'lower(word)', 'dedup_lower(word)', 'dedup_pattern_key(word)')
+}
+
+# 按ID大批量删除时可以暂时删除的索引：删除用不到按词条的单列索引，只需逐行维护它
+_DEDUP_SUSPENDABLE_INDEXES = ('idx_words_word',)
+# 词条总数：先用各字典维护的词条数量之和粗略判断，只有接近阈值时才统计整个词条表
+_SUM_WORD_COUNTS_SQL = "SELECT COALESCE(SUM(word_count), 0) FROM dictionaries"
+_COUNT_ALL_WORDS_SQL = "SELECT COUNT(*) FROM words"
+
+# 模式去重的默认模式
+_DEFAULT_DEDUP_PATTERN = r'[a-zA-Z0-9]+'
+# ASCII词条按字节删去字母数字以外的字符并转小写，与默认模式的提取结果一致
+_NON_ALNUM_BYTES = bytes(b for b in range(128) if not chr(b).isalnum()) + bytes(range(128, 256))
+_ASCII_LOWER_TABLE = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+_DEFAULT_DEDUP_REGEX = re.compile(_DEFAULT_DEDUP_PATTERN)
+
+# 字典中是否有可打印ASCII以外的字符
+_HAS_NON_ASCII_WORD_SQL = "SELECT 1 FROM words WHERE dictionary_id = ? AND word GLOB '*[^ -~]*' LIMIT 1"
+
+
+
+def _words_digest(words: List[str]) -> bytes:
+    """
+    计算词条列表内容的摘要，作为分析结果的缓存键
+    
+    同时对各词条长度和拼接后的文本求摘要，词条中含分隔符时也不会与其他列表混淆；顺序不同的列表摘要不同。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(array('Q', map(len, words)).tobytes())
+    digest.update('\0'.join(words).encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+
+def _default_pattern_key(word: str) -> str:
+    """按默认模式提取词条中的字母数字部分并转小写，作为模式去重的比较键"""
+    if word.isascii():
+        return word.encode('ascii').translate(_ASCII_LOWER_TABLE, _NON_ALNUM_BYTES).decode('ascii')
+    return ''.join(_DEFAULT_DEDUP_REGEX.findall(word)).lower()
+
+
+# 注册到SQLite连接的比较键函数，分组在数据库内完成，不必把词条读到Python中
+_SQL_KEY_FUNCTIONS = {
+    'dedup_lower': str.lower,
+    'dedup_pattern_key': _default_pattern_key
+}
+
 
+def _build_matcher(text_lower: str) -> SequenceMatcher:
+    """为一个(已转小写的)词条建立SequenceMatcher，作为seq2的索引只建一次，可与多个词条比较"""
+    matcher = SequenceMatcher(None)
+    matcher.set_seq2(text_lower)
+    return matcher
+
+
+def _length_window(length: int, threshold: float) -> Tuple[int, float]:
+    """
+    与长度为length的词条相似度可能达到阈值的词条长度范围
+    
+    相似度不超过 2*min(la, lb)/(la + lb)，据此得到另一个词条的长度上下限。
+    范围两端各放宽1，边界上的词条仍由_similarity_at_least精确判断。
+    
+    Args:
+        length: 词条长度
+        threshold: 相似度阈值
+        
+    Returns:
+        Tuple[int, float]: 长度下限和上限
+    """
+    if threshold <= 0:
+        return 0, float('inf')
+    if threshold >= 2:
+        return length + 1, -1
+    low = int(length * threshold / (2 - threshold)) - 1
+    high = length * (2 - threshold) / threshold + 1
+    return low, high
+
+
+def _rank_chars_by_frequency(texts: List[str]) -> Dict[str, int]:
+    """按字符在所有词条中出现的次数从少到多编号，作为前缀过滤的全局字符顺序"""
+    char_counts = Counter(chain.from_iterable(texts))
+    ordered = sorted(char_counts, key=lambda char: (char_counts[char], char))
+    return {char: rank for rank, char in enumerate(ordered)}
+
+
+def _prefix_elements(text_lower: str, char_rank: Dict[str, int], threshold: float) -> List[Tuple[int, int]]:
+    """
+    前缀过滤用的词条前缀
+    
+    词条看作(字符, 第几次出现)组成的集合，按全局字符顺序排序。相似度达到阈值时匹配的字符数
+    至少为 threshold*(la+lb)/2，结合长度范围不少于 threshold*la/(2-threshold)，
+    而匹配的字符数不超过两个集合的交集大小，所以两个相似词条的前缀必有公共元素。
+    
+    Args:
+        text_lower: 转小写后的词条
+        char_rank: _rank_chars_by_frequency得到的字符顺序
+        threshold: 相似度阈值，取值范围(0, 1]
+        
+    Returns:
+        List[Tuple[int, int]]: 前缀元素
+    """
+    occurrences = {}
+    elements = []
+    for char in text_lower:
+        occurrence = occurrences.get(char, 0)
+        occurrences[char] = occurrence + 1
+        elements.append((char_rank[char], occurrence))
+    elements.sort()
+    
+    # 需要的最少公共元素数，减去一个很小的数避免浮点误差把它算大
+    required = max(0, math.ceil(threshold * len(elements) / (2 - threshold) - 1e-9))
+    return elements[:len(elements) - required + 1]
+
+def _similarity_at_least(matcher: SequenceMatcher, text_lower: str, threshold: float) -> Optional[float]:
+    """
+    计算text_lower与matcher中词条的相似度，结果与_calculate_similarity(text, matcher中的词条)一致
+    
+    先用相似度的上界排除明显不相似的词条，只有上界达到阈值时才计算ratio()。
+    
+    Args:
+        matcher: _build_matcher建立的SequenceMatcher
+        text_lower: 转小写后的词条
+        threshold: 相似度阈值
+        
+    Returns:
+        Optional[float]: 相似度达到阈值时返回相似度，否则返回None
+    """
+    matcher.set_seq1(text_lower)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return None
+    # 最长公共子序列得到的相似度不小于ratio()，同样是上界，留出浮点误差的余量
+    if fuzz is not None and fuzz.ratio(text_lower, matcher.b) < threshold * 100 - 1e-6:
+        return None
+    similarity = matcher.ratio()
+    return similarity if similarity >= threshold else None
 
 class Deduplicator:
     """去重器"""
@@ -25,6 +188,14 @@ class Deduplicator:
             'length': self.length_duplicate,
             'pattern': self.pattern_duplicate
         }
+        # 按比较键去重的策略，键相同的词条只保留第一个
+        self._dedup_keys = {
+            'exact': str,
+            'case_insensitive': str.lower,
+            'pattern': _default_pattern_key
+        }
+        # 重复分析和策略建议的结果，键为(方法名, 词条内容摘要)
+        self._analysis_cache: Dict[Tuple[str, bytes], Any] = {}
     
     def exact_duplicate(self, words: List[str]) -> List[str]:
         """
@@ -87,25 +258,79 @@ class Deduplicator:
         if threshold is None:
             threshold = SIMILARITY_THRESHOLD
         
-        unique_words = []
-        
-        for word in words:
-            is_similar = False
-            
-            for existing_word in unique_words:
-                similarity = self._calculate_similarity(word, existing_word)
-                if similarity >= threshold:
-                    is_similar = True
-                    break
-            
-            if not is_similar:
-                unique_words.append(word)
+        unique_words = [
+            word for word, is_similar in zip(words, self._iter_similarity_flags(words, threshold))
+            if not is_similar
+        ]
         
         removed_count = len(words) - len(unique_words)
         logging.info(f"相似度去重完成 (阈值: {threshold}): 移除 {removed_count} 个相似词条")
         
         return unique_words
     
+    def _iter_similarity_flags(self, words: List[str], threshold: float,
+                               lowered: Optional[List[str]] = None) -> Iterator[bool]:
+        """
+        按顺序判断每个词条是否与之前保留的词条相似，逐个产出结果，调用方可以提前停止
+        
+        Args:
+            words: 词条列表
+            threshold: 相似度阈值
+            lowered: 与words一一对应的小写形式，调用方已经算过时传入以免重复转换
+            
+        Yields:
+            bool: 词条是否与之前保留的词条相似（相似即被去除）
+        """
+        if lowered is None:
+            lowered = [word.lower() for word in words]
+        # 已处理过的小写形式：相同字符串的相似度为1，之前保留或判为相似的词条再次出现时必然相似
+        seen_lowers = set()
+        
+        if 0 < threshold <= 1:
+            # 前缀过滤：保留的词条按字符前缀建倒排索引，只与共享前缀字符的词条比较
+            char_rank = _rank_chars_by_frequency(lowered)
+            prefix_index = defaultdict(list)
+            
+            for word_lower in lowered:
+                if word_lower in seen_lowers:
+                    yield True
+                    continue
+                seen_lowers.add(word_lower)
+                
+                prefix = _prefix_elements(word_lower, char_rank, threshold)
+                candidates = {matcher for element in prefix for matcher in prefix_index.get(element, ())}
+                is_similar = any(
+                    _similarity_at_least(matcher, word_lower, threshold) is not None
+                    for matcher in candidates
+                )
+                
+                if not is_similar:
+                    matcher = _build_matcher(word_lower)
+                    for element in prefix:
+                        prefix_index[element].append(matcher)
+                yield is_similar
+            return
+        
+        # 阈值不在(0, 1]时前缀过滤不适用；按长度分组，只比较长度可能相似的词条
+        unique_matchers = defaultdict(list)
+        
+        for word_lower in lowered:
+            if threshold <= 1 and word_lower in seen_lowers:
+                yield True
+                continue
+            seen_lowers.add(word_lower)
+            
+            low, high = _length_window(len(word_lower), threshold)
+            is_similar = any(
+                _similarity_at_least(matcher, word_lower, threshold) is not None
+                for length, matchers in unique_matchers.items() if low <= length <= high
+                for matcher in matchers
+            )
+            
+            if not is_similar:
+                unique_matchers[len(word_lower)].append(_build_matcher(word_lower))
+            yield is_similar
+    
     def length_duplicate(self, words: List[str], keep_longest: bool = True) -> List[str]:
         """
         长度去重 - 对于相似的词条，保留最长或最短的
@@ -152,17 +377,21 @@ class Deduplicator:
         """
         if pattern is None:
             # 默认模式：提取字母数字部分
-            pattern = r'[a-zA-Z0-9]+'
+            pattern = _DEFAULT_DEDUP_PATTERN
         
         try:
             regex = re.compile(pattern)
             seen_patterns = set()
             unique_words = []
             
+            is_default_pattern = pattern == _DEFAULT_DEDUP_PATTERN
+            
             for word in words:
                 # 提取匹配模式的部分
-                matches = regex.findall(word)
-                pattern_key = ''.join(matches).lower()
+                if is_default_pattern:
+                    pattern_key = _default_pattern_key(word)
+                else:
+                    pattern_key = ''.join(regex.findall(word)).lower()
                 
                 if pattern_key not in seen_patterns:
                     seen_patterns.add(pattern_key)
@@ -235,21 +464,37 @@ class Deduplicator:
                     duplicate_groups[group[0]] = group
                     
         elif strategy == 'similarity':
-            processed = set()
+            # 每个词条只转一次小写；相同的词条共用第一次出现的位置，处理标记按位置记录，内层循环不再对字符串求哈希
+            lowered = [word.lower() for word in words]
+            first_index = {}
+            canonical = [first_index.setdefault(word, index) for index, word in enumerate(words)]
+            processed = bytearray(len(words))
+            matchers = [None] * len(words)
+            
+            # 按长度排序的下标，只比较长度可能相似的词条
+            by_length = sorted(range(len(words)), key=lambda index: len(lowered[index]))
+            sorted_lengths = [len(lowered[index]) for index in by_length]
+            
             for i, word1 in enumerate(words):
-                if word1 in processed:
+                if processed[canonical[i]]:
                     continue
                     
                 similar_group = [word1]
-                processed.add(word1)
+                processed[canonical[i]] = 1
                 
-                for j, word2 in enumerate(words[i+1:], i+1):
-                    if word2 in processed:
+                low, high = _length_window(len(lowered[i]), SIMILARITY_THRESHOLD)
+                start = bisect_left(sorted_lengths, low)
+                end = bisect_right(sorted_lengths, high)
+                # 候选词条按原顺序比较，分组结果与逐个比较一致
+                for j in sorted(j for j in by_length[start:end] if j > i):
+                    if processed[canonical[j]]:
                         continue
-                        
-                    if self._calculate_similarity(word1, word2) >= SIMILARITY_THRESHOLD:
-                        similar_group.append(word2)
-                        processed.add(word2)
+                    
+                    if matchers[j] is None:
+                        matchers[j] = _build_matcher(lowered[j])
+                    if _similarity_at_least(matchers[j], lowered[i], SIMILARITY_THRESHOLD) is not None:
+                        similar_group.append(words[j])
+                        processed[canonical[j]] = 1
                 
                 if len(similar_group) > 1:
                     duplicate_groups[word1] = similar_group
@@ -260,6 +505,9 @@ class Deduplicator:
         """
         从数据库中的字典移除重复词条
         
+        精确、忽略大小写和模式去重直接在SQL中按比较键分组，每组保留最早添加的词条；
+        其他策略（以及SQLite不支持注册函数时）读出词条后在Python中去重。
+        
         Args:
             dictionary_id: 字典ID
             strategy: 去重策略
@@ -270,61 +518,158 @@ class Deduplicator:
         if strategy is None:
             strategy = DEFAULT_DEDUP_STRATEGY
         
+        if strategy not in self.strategies:
+            logging.warning(f"未知的去重策略: {strategy}，使用精确去重")
+            strategy = 'exact'
+        
         try:
-            # 获取字典中的所有词条
-            words_data = self.db.fetch_all(
-                "SELECT id, word FROM words WHERE dictionary_id = ?",
-                (dictionary_id,)
-            )
-            
-            if not words_data:
-                return 0
-            
-            # 提取词条文本
-            words = [row['word'] for row in words_data]
-            word_id_map = {row['word']: row['id'] for row in words_data}
-            
-            # 执行去重
-            if strategy in self.strategies:
-                unique_words = self.strategies[strategy](words)
-            else:
-                logging.warning(f"未知的去重策略: {strategy}，使用精确去重")
-                unique_words = self.exact_duplicate(words)
-            
-            # 找出要删除的词条ID
-            unique_word_set = set(unique_words)
-            words_to_delete = []
-            
-            for word in words:
-                if word not in unique_word_set:
-                    words_to_delete.append(word_id_map[word])
+            # 查询、删除和更新时间在同一个事务中完成，只提交一次
+            with self.db.transaction() as conn:
+                group_key = self._sql_group_key(conn, dictionary_id, strategy)
+                if group_key is not None:
+                    cursor = self.db.execute_query(_DELETE_DUPLICATES_SQL[group_key], (dictionary_id, dictionary_id))
                 else:
-                    # 从集合中移除，避免重复保留
-                    unique_word_set.discard(word)
-            
-            # 删除重复词条
-            if words_to_delete:
-                placeholders = ','.join(['?'] * len(words_to_delete))
-                query = f"DELETE FROM words WHERE id IN ({placeholders})"
-                cursor = self.db.execute_query(query, words_to_delete)
-                deleted_count = cursor.rowcount
+                    words_to_delete = self._find_duplicate_word_ids(dictionary_id, strategy)
+                    if not words_to_delete:
+                        return 0
+                    indexes = self._indexes_to_suspend(len(words_to_delete))
+                    with self.db.suspended_indexes(indexes):
+                        # ID写入临时表后连接删除，不受SQLite变量数上限的限制
+                        cursor = self.db.execute_with_values(_DELETE_WORDS_BY_ID_SQL, words_to_delete)
                 
-                # 更新字典的更新时间
-                from datetime import datetime
-                self.db.execute_query(
-                    "UPDATE dictionaries SET updated_at = ? WHERE id = ?",
-                    (datetime.now(), dictionary_id)
-                )
+                deleted_count = cursor.rowcount
+                if deleted_count > 0:
+                    # 更新字典的更新时间和词条数量。不改用words表上的AFTER DELETE触发器：SQLite触发器逐行执行，
+                    # 一次删除大量重复词条时会执行同样多次UPDATE，实测批量删除耗时翻倍；这里整批只更新一次
+                    self.db.execute_query(_TOUCH_DICTIONARY_SQL, (datetime.now(), deleted_count, dictionary_id))
+                    
+                    logging.info(f"从字典 {dictionary_id} 中移除 {deleted_count} 个重复词条")
                 
-                logging.info(f"从字典 {dictionary_id} 中移除 {deleted_count} 个重复词条")
                 return deleted_count
             
-            return 0
-            
         except Exception as e:
             logging.error(f"数据库去重失败: {e}")
             return 0
     
+    def _sql_group_key(self, conn: sqlite3.Connection, dictionary_id: int, strategy: str) -> Optional[str]:
+        """
+        确定在SQL中去重时使用的分组表达式
+        
+        SQLite的lower()只转换ASCII字母，字典含非ASCII字符时改用注册的Python比较键函数；
+        模式去重同样使用注册的函数。相似度和长度去重需要比较多个词条，仍由Python完成。
+        
+        Args:
+            conn: 当前事务使用的数据库连接
+            dictionary_id: 字典ID
+            strategy: 去重策略
+            
+        Returns:
+            Optional[str]: 分组表达式，无法用SQL去重时返回None
+        """
+        if strategy == 'exact':
+            return 'word'
+        if strategy == 'case_insensitive':
+            if self.db.fetch_one(_HAS_NON_ASCII_WORD_SQL, (dictionary_id,)) is None:
+                return 'lower(word)'
+            function_name = 'dedup_lower'
+        elif strategy == 'pattern':
+            function_name = 'dedup_pattern_key'
+        else:
+            return None
+        
+        # 同名函数重复注册会覆盖之前的注册，每次调用前注册即可保证连接上可用；
+        # SQLite版本过旧不支持deterministic时回退到Python端按比较键去重
+        try:
+            conn.create_function(function_name, 1, _SQL_KEY_FUNCTIONS[function_name], deterministic=True)
+        except sqlite3.NotSupportedError:
+            return None
+        return f'{function_name}(word)'
+    
+    def _indexes_to_suspend(self, delete_count: int) -> Tuple[str, ...]:
+        """
+        判断按ID删除时是否值得暂时删除索引
+        
+        重建索引的代价与整个词条表的大小成正比，只有删除的词条占词条表的比例足够大时才划算。
+        SQL去重事先不知道删除数量，统计一遍的开销与节省的时间相当，因此只用于按ID删除。
+        删除数量较少或明显低于各字典词条数量之和的比例时直接返回，不统计整个词条表。
+        
+        Args:
+            delete_count: 要删除的词条数量
+            
+        Returns:
+            Tuple[str, ...]: 要暂时删除的索引名称，不需要时为空
+        """
+        if delete_count < DEDUP_INDEX_REBUILD_MIN_COUNT:
+            return ()
+        
+        # 词条数量随增删词条同步维护，读取字典表即可；旧数据库中可能与实际不符，超过阈值时再按实际数量确认
+        if delete_count <= self.db.fetch_one(_SUM_WORD_COUNTS_SQL)[0] * DEDUP_INDEX_REBUILD_RATIO:
+            return ()
+        
+        total_count = self.db.fetch_one(_COUNT_ALL_WORDS_SQL)[0]
+        if delete_count <= total_count * DEDUP_INDEX_REBUILD_RATIO:
+            return ()
+        return _DEDUP_SUSPENDABLE_INDEXES
+    
+    def _find_duplicate_word_ids(self, dictionary_id: int, strategy: str) -> List[int]:
+        """
+        读出字典中的词条，用指定策略在Python中去重，返回要删除的词条ID
+        
+        Args:
+            dictionary_id: 字典ID
+            strategy: 去重策略
+            
+        Returns:
+            List[int]: 要删除的词条ID列表
+        """
+        # 获取字典中的所有词条，按添加顺序排列，与SQL去重一样保留最早添加的词条
+        words_data = self.db.fetch_all(
+            "SELECT id, word FROM words WHERE dictionary_id = ? ORDER BY id",
+            (dictionary_id,)
+        )
+        
+        if not words_data:
+            return []
+        
+        key_fn = self._dedup_keys.get(strategy)
+        if key_fn is not None:
+            # 一次遍历：比较键已出现过的词条直接记为删除
+            kept_keys = set()
+            words_to_delete = []
+            for row in words_data:
+                key = key_fn(row['word'])
+                if key in kept_keys:
+                    words_to_delete.append(row['id'])
+                else:
+                    kept_keys.add(key)
+            return words_to_delete
+        
+        words = [row['word'] for row in words_data]
+        if strategy == 'similarity':
+            # 与保留词条相似的词条，以及与保留词条完全相同的词条都要删除
+            kept_words = set()
+            words_to_delete = []
+            for row, is_similar in zip(words_data, self._iter_similarity_flags(words, SIMILARITY_THRESHOLD)):
+                word = row['word']
+                if is_similar or word in kept_words:
+                    words_to_delete.append(row['id'])
+                else:
+                    kept_words.add(word)
+            return words_to_delete
+        
+        # 其他策略先去重，再按词条找出要删除的ID，每个保留的词条只保留第一次出现的那一条
+        unique_word_set = set(self.strategies[strategy](words))
+        words_to_delete = []
+        
+        for row in words_data:
+            word = row['word']
+            if word in unique_word_set:
+                unique_word_set.discard(word)
+            else:
+                words_to_delete.append(row['id'])
+        
+        return words_to_delete
+    
     def analyze_duplicates(self, words: List[str]) -> Dict[str, Any]:
         """
         分析重复情况
@@ -335,27 +680,42 @@ class Deduplicator:
         Returns:
             Dict[str, Any]: 分析结果
         """
+        # 同样的词条列表再次分析时直接返回缓存的结果副本，调用方修改返回值不影响缓存
+        cache_key = ('analyze_duplicates', _words_digest(words))
+        cached = self._analysis_cache.get(cache_key)
+        if cached is None:
+            cached = self._analyze_duplicates(words)
+            self._store_analysis(cache_key, cached)
+        return copy.deepcopy(cached)
+    
+    def _analyze_duplicates(self, words: List[str]) -> Dict[str, Any]:
+        """分析重复情况，不经过缓存"""
+        # 小写形式只计算一次，供各项统计和相似度去重共用
+        lowered = [word.lower() for word in words]
         analysis = {
             'total_words': len(words),
             'unique_exact': len(set(words)),
-            'unique_case_insensitive': len(set(word.lower() for word in words)),
+            'unique_case_insensitive': len(set(lowered)),
             'strategies': {}
         }
         
-        # 分析各种策略的去重效果
+        # 分析各种策略的去重效果；精确和忽略大小写去重的结果数量就是上面的去重计数，不必再运行一遍
         for strategy_name, strategy_func in self.strategies.items():
             try:
-                if strategy_name == 'similarity':
-                    unique_words = strategy_func(words.copy(), SIMILARITY_THRESHOLD)
-                elif strategy_name in ['length', 'pattern']:
-                    unique_words = strategy_func(words.copy())
+                if strategy_name == 'exact':
+                    unique_count = analysis['unique_exact']
+                elif strategy_name == 'case_insensitive':
+                    unique_count = analysis['unique_case_insensitive']
+                elif strategy_name == 'similarity':
+                    similar_count = sum(self._iter_similarity_flags(words, SIMILARITY_THRESHOLD, lowered))
+                    unique_count = len(words) - similar_count
                 else:
-                    unique_words = strategy_func(words.copy())
+                    unique_count = len(strategy_func(words))
                 
                 analysis['strategies'][strategy_name] = {
-                    'unique_count': len(unique_words),
-                    'removed_count': len(words) - len(unique_words),
-                    'removal_rate': (len(words) - len(unique_words)) / len(words) * 100
+                    'unique_count': unique_count,
+                    'removed_count': len(words) - unique_count,
+                    'removal_rate': (len(words) - unique_count) / len(words) * 100
                 }
             except Exception as e:
                 logging.error(f"分析策略 {strategy_name} 失败: {e}")
@@ -368,6 +728,12 @@ class Deduplicator:
         
         return analysis
     
+    def _store_analysis(self, cache_key: Tuple[str, bytes], result: Any):
+        """保存分析结果，缓存满时整体清空"""
+        if len(self._analysis_cache) >= DEDUP_ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.clear()
+        self._analysis_cache[cache_key] = result
+    
     def _calculate_similarity(self, str1: str, str2: str) -> float:
         """
         计算两个字符串的相似度
@@ -393,11 +759,22 @@ class Deduplicator:
             List[Tuple[str, str, float]]: 相似词条对列表 (词条1, 词条2, 相似度)
         """
         similar_pairs = []
+        lowered = [word.lower() for word in words]
+        matchers = [_build_matcher(word_lower) for word_lower in lowered]
+        
+        # 按长度排序的下标，用二分查找取出长度可能相似的词条
+        by_length = sorted(range(len(words)), key=lambda index: len(lowered[index]))
+        sorted_lengths = [len(lowered[index]) for index in by_length]
         
         for i in range(len(words)):
-            for j in range(i + 1, len(words)):
-                similarity = self._calculate_similarity(words[i], words[j])
-                if similarity >= threshold:
+            low, high = _length_window(len(lowered[i]), threshold)
+            start = bisect_left(sorted_lengths, low)
+            end = bisect_right(sorted_lengths, high)
+            # 候选词条按原顺序比较，结果顺序与逐对比较一致
+            candidates = sorted(j for j in by_length[start:end] if j > i)
+            for j in candidates:
+                similarity = _similarity_at_least(matchers[j], lowered[i], threshold)
+                if similarity is not None:
                     similar_pairs.append((words[i], words[j], similarity))
         
         # 按相似度降序排序
@@ -415,22 +792,38 @@ class Deduplicator:
         Returns:
             str: 建议的策略名称
         """
-        analysis = self.analyze_duplicates(words)
+        cache_key = ('suggest_dedup_strategy', _words_digest(words))
+        suggestion = self._analysis_cache.get(cache_key)
+        if suggestion is None:
+            suggestion = self._suggest_dedup_strategy(words)
+            self._store_analysis(cache_key, suggestion)
+        return suggestion
+    
+    def _suggest_dedup_strategy(self, words: List[str]) -> str:
+        """建议最佳去重策略，不经过缓存"""
+        total = len(words)
+        if total == 0:
+            return 'exact'
         
+        # 按代价从低到高判断，满足条件即返回，不必像analyze_duplicates那样运行所有策略
         # 如果精确重复很多，建议精确去重
-        exact_removal_rate = analysis['strategies']['exact']['removal_rate']
+        exact_removal_rate = (total - len(set(words))) / total * 100
         if exact_removal_rate > 20:
             return 'exact'
         
         # 如果大小写重复较多，建议忽略大小写去重
-        case_removal_rate = analysis['strategies']['case_insensitive']['removal_rate']
+        lowered = [word.lower() for word in words]
+        case_removal_rate = (total - len(set(lowered))) / total * 100
         if case_removal_rate > 10:
             return 'case_insensitive'
         
-        # 如果相似度重复较多，建议相似度去重
-        similarity_removal_rate = analysis['strategies']['similarity']['removal_rate']
-        if similarity_removal_rate > 5:
-            return 'similarity'
+        # 如果相似度重复较多，建议相似度去重；去除的词条一超过5%就可以停止比较
+        removed_count = 0
+        for is_similar in self._iter_similarity_flags(words, SIMILARITY_THRESHOLD, lowered):
+            if is_similar:
+                removed_count += 1
+                if removed_count / total * 100 > 5:
+                    return 'similarity'
         
         # 默认建议精确去重
         return 'exact'
@@ -3,10 +3,118 @@
 负责字典的创建、删除、修改和查询操作
 """
 import logging
-from typing import List, Dict, Any, Optional
+import string
+from collections import defaultdict
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
 from datetime import datetime
 
 from .database import db_manager
+from config.settings import CHUNK_SIZE
+
+
+# 增删词条路径上的SQL，文本固定以便命中连接的语句缓存
+_DICTIONARY_EXISTS_SQL = "SELECT 1 FROM dictionaries WHERE id = ? LIMIT 1"
+# 临时表的主键已去掉本批中重复的词条，再跳过字典中已有的词条（走idx_words_dictionary_word），
+# 按写入临时表的顺序插入，保持词条ID与输入顺序一致
+_INSERT_NEW_WORDS_SQL = """INSERT INTO words (word, dictionary_id, created_at)
+                           SELECT t.value, ?1, ?2 FROM temp_values t
+                           WHERE NOT EXISTS (SELECT 1 FROM words w
+                                             WHERE w.dictionary_id = ?1 AND w.word = t.value)
+                           ORDER BY t.rowid"""
+_DELETE_WORDS_BY_ID_SQL = """DELETE FROM words 
+                             WHERE id IN (SELECT value FROM temp_values) 
+                             AND dictionary_id = ?"""
+# 复制词条，源词条都经add_words写入，已去除首尾空白且非空。与add_words相同，跳过目标字典中已有的词条
+# （走idx_words_dictionary_word），复制的词条中重复的只保留ID最小的一个，并按它的ID顺序插入。
+# 按ID复制时用CROSS JOIN固定以临时表为外层，按主键逐个查找词条，不必扫描整个源字典
+_COPY_ALL_WORDS_SQL = """INSERT INTO words (word, dictionary_id, created_at)
+                         SELECT w.word, ?1, ?2 FROM words w
+                         WHERE w.dictionary_id = ?3
+                           AND NOT EXISTS (SELECT 1 FROM words x
+                                           WHERE x.dictionary_id = ?1 AND x.word = w.word)
+                         GROUP BY w.word
+                         ORDER BY MIN(w.id)"""
+_COPY_WORDS_BY_ID_SQL = """INSERT INTO words (word, dictionary_id, created_at)
+                           SELECT w.word, ?1, ?2 FROM temp_values t
+                           CROSS JOIN words w ON w.id = t.value
+                           WHERE w.dictionary_id = ?3
+                             AND NOT EXISTS (SELECT 1 FROM words x
+                                             WHERE x.dictionary_id = ?1 AND x.word = w.word)
+                           GROUP BY w.word
+                           ORDER BY MIN(w.id)"""
+# 刷新字典的更新时间并按增删的数量调整词条数量，删除时数量为负。与增删词条在同一事务中每批只执行一次；
+# 不改用words表上的触发器，SQLite触发器逐行执行，批量增删多少行就要多执行多少次UPDATE
+_TOUCH_DICTIONARY_SQL = "UPDATE dictionaries SET updated_at = ?, word_count = word_count + ? WHERE id = ?"
+_WORD_COUNT_SQL = "SELECT word_count as count FROM dictionaries WHERE id = ?"
+# 临时表中各ID对应的字典，一次查询取回一组字典
+_SELECT_DICTIONARIES_BY_ID_SQL = """SELECT d.*
+                                    FROM temp_values v
+                                    CROSS JOIN dictionaries d ON d.id = v.value"""
+
+# 字典中的词条，按ID倒序，沿idx_words_dict_id读取，不连接标签表也不分组
+_SELECT_WORDS_SQL = """SELECT * FROM words
+                       WHERE dictionary_id = ?
+                       ORDER BY id DESC"""
+_SELECT_WORDS_PAGE_SQL = _SELECT_WORDS_SQL + "\n                       LIMIT ? OFFSET ?"
+# 在字典中按关键词筛选词条，沿(dictionary_id, word)索引按词条顺序读取，取够limit条即停止
+_SEARCH_WORDS_SQL = """SELECT * FROM words
+                       WHERE dictionary_id = ? AND word LIKE ?
+                       ORDER BY word
+                       LIMIT ?"""
+# 按前缀搜索，沿(dictionary_id, lower(word))索引只读取前缀范围内的词条，按不区分大小写的顺序取够limit条即停止
+_SEARCH_WORDS_BY_PREFIX_SQL = """SELECT * FROM words
+                                 WHERE dictionary_id = ? AND lower(word) >= ? AND lower(word) < ?
+                                 ORDER BY lower(word)
+                                 LIMIT ?"""
+# 一段连续ID范围内词条的标签名称。按ID顺序读取的一批词条正是字典在其最小、最大ID之间的全部词条
+_SELECT_TAG_NAMES_IN_RANGE_SQL = """SELECT wt.word_id, t.name
+                                    FROM words w
+                                    JOIN word_tags wt ON wt.word_id = w.id
+                                    JOIN tags t ON t.id = wt.tag_id
+                                    WHERE w.dictionary_id = ? AND w.id BETWEEN ? AND ?"""
+# 临时表中各词条的标签名称，用于ID不连续的一批词条
+_SELECT_TAG_NAMES_BY_ID_SQL = """SELECT wt.word_id, t.name
+                                 FROM temp_values v
+                                 CROSS JOIN word_tags wt ON wt.word_id = v.value
+                                 JOIN tags t ON t.id = wt.tag_id"""
+
+
+# SQLite的lower()和LIKE只转换ASCII字母的大小写，前缀也按同样的规则转成小写
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _prefix_range(prefix: str) -> Tuple[str, Any]:
+    """
+    以prefix开头的字符串所在的范围 [下界, 上界)
+    
+    SQLite按UTF-8字节比较文本，与按码位比较的顺序相同，把最后一个字符加一即得到上界。
+    前缀全由最大码位组成时没有这样的上界，改用空BLOB：SQLite中任何文本都小于BLOB。
+    
+    Args:
+        prefix: 前缀
+        
+    Returns:
+        Tuple[str, Any]: 下界和上界
+    """
+    chars = list(prefix)
+    while chars:
+        code = ord(chars.pop()) + 1
+        if code == 0xD800:
+            # 代理区的码位不能编码为UTF-8，跳到代理区之后
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix, ''.join(chars) + chr(code)
+    return prefix, b''
+
+
+def _now_text() -> str:
+    """
+    当前时间的文本形式，与sqlite3默认的datetime适配器写入的格式相同
+    
+    批量插入时每行都绑定同一个时间，预先转成文本，不必对每一行调用适配器。
+    """
+    return datetime.now().isoformat(' ')
 
 
 class DictionaryManager:
@@ -16,6 +124,18 @@ class DictionaryManager:
         """初始化字典管理器"""
         self.db = db_manager
     
+    def _dictionary_exists(self, dictionary_id: int) -> bool:
+        """
+        检查字典是否存在，只查询是否有这一行，不读取字典信息
+        
+        Args:
+            dictionary_id: 字典ID
+            
+        Returns:
+            bool: 字典是否存在
+        """
+        return self.db.fetch_one(_DICTIONARY_EXISTS_SQL, (dictionary_id,)) is not None
+    
     def create_dictionary(self, name: str, description: str = "") -> int:
         """
         创建新字典
@@ -39,11 +159,12 @@ class DictionaryManager:
             if existing:
                 raise ValueError(f"字典名称 '{name}' 已存在")
             
-            # 创建新字典
+            # 创建新字典，创建时间和更新时间相同
+            now = _now_text()
             cursor = self.db.execute_query(
                 """INSERT INTO dictionaries (name, description, created_at, updated_at) 
                    VALUES (?, ?, ?, ?)""",
-                (name, description, datetime.now(), datetime.now())
+                (name, description, now, now)
             )
             
             dictionary_id = cursor.lastrowid
@@ -65,8 +186,10 @@ class DictionaryManager:
             bool: 删除是否成功
         """
         try:
-            # 检查字典是否存在
-            dictionary = self.get_dictionary_by_id(dictionary_id)
+            # 检查字典是否存在，只取日志需要的名称
+            dictionary = self.db.fetch_one(
+                "SELECT name FROM dictionaries WHERE id = ?", (dictionary_id,)
+            )
             if not dictionary:
                 logging.warning(f"字典不存在: ID {dictionary_id}")
                 return False
@@ -109,7 +232,7 @@ class DictionaryManager:
             # 更新字典名称
             cursor = self.db.execute_query(
                 "UPDATE dictionaries SET name = ?, updated_at = ? WHERE id = ?",
-                (new_name, datetime.now(), dictionary_id)
+                (new_name, _now_text(), dictionary_id)
             )
             
             success = cursor.rowcount > 0
@@ -136,7 +259,7 @@ class DictionaryManager:
         try:
             cursor = self.db.execute_query(
                 "UPDATE dictionaries SET description = ?, updated_at = ? WHERE id = ?",
-                (description, datetime.now(), dictionary_id)
+                (description, _now_text(), dictionary_id)
             )
             
             success = cursor.rowcount > 0
@@ -157,13 +280,9 @@ class DictionaryManager:
             List[Dict[str, Any]]: 字典列表
         """
         try:
+            # 词条数量保存在字典表的word_count列中，不必连接词条表计数
             rows = self.db.fetch_all(
-                """SELECT d.*, 
-                          COUNT(w.id) as word_count
-                   FROM dictionaries d
-                   LEFT JOIN words w ON d.id = w.dictionary_id
-                   GROUP BY d.id
-                   ORDER BY d.created_at DESC"""
+                "SELECT * FROM dictionaries ORDER BY created_at DESC"
             )
             
             return [dict(row) for row in rows]
@@ -184,12 +303,7 @@ class DictionaryManager:
         """
         try:
             row = self.db.fetch_one(
-                """SELECT d.*, 
-                          COUNT(w.id) as word_count
-                   FROM dictionaries d
-                   LEFT JOIN words w ON d.id = w.dictionary_id
-                   WHERE d.id = ?
-                   GROUP BY d.id""",
+                "SELECT * FROM dictionaries WHERE id = ?",
                 (dictionary_id,)
             )
             
@@ -199,6 +313,25 @@ class DictionaryManager:
             logging.error(f"获取字典失败: {e}")
             return None
     
+    def get_dictionaries_by_ids(self, dictionary_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        根据一组ID获取字典，一次查询代替逐个调用get_dictionary_by_id
+        
+        Args:
+            dictionary_ids: 字典ID列表
+            
+        Returns:
+            Dict[int, Dict[str, Any]]: 字典ID到字典信息的映射，不存在的ID不在其中
+        """
+        try:
+            rows = self.db.fetch_all_with_values(_SELECT_DICTIONARIES_BY_ID_SQL, dictionary_ids)
+            
+            return {row['id']: dict(row) for row in rows}
+            
+        except Exception as e:
+            logging.error(f"获取字典失败: {e}")
+            return {}
+    
     def get_dictionary_stats(self, dictionary_id: int) -> Dict[str, Any]:
         """
         获取字典统计信息
@@ -233,11 +366,11 @@ class DictionaryManager:
                 stats['unique_words'] = word_stats['unique_words']
                 stats['duplicate_words'] = word_stats['total_words'] - word_stats['unique_words']
             
-            # 标签统计
+            # 标签统计：从标签关联表出发按主键查词条，没有标签的词条不参与计数，不必逐个扫描字典中的词条
             tag_stats = self.db.fetch_one(
                 """SELECT COUNT(DISTINCT wt.tag_id) as tagged_count
-                   FROM words w
-                   LEFT JOIN word_tags wt ON w.id = wt.word_id
+                   FROM word_tags wt
+                   JOIN words w ON w.id = wt.word_id
                    WHERE w.dictionary_id = ?""",
                 (dictionary_id,)
             )
@@ -260,31 +393,28 @@ class DictionaryManager:
             words: 词条列表
             
         Returns:
-            int: 成功添加的词条数量
+            int: 实际添加的词条数量，不含重复的和字典中已有的词条
         """
         try:
-            # 检查字典是否存在
-            if not self.get_dictionary_by_id(dictionary_id):
-                raise ValueError(f"字典不存在: ID {dictionary_id}")
-            
-            # 准备插入数据
-            current_time = datetime.now()
-            word_data = [(word.strip(), dictionary_id, current_time) for word in words if word.strip()]
-            
-            if not word_data:
-                return 0
-            
-            # 批量插入词条
-            added_count = self.db.execute_many(
-                "INSERT INTO words (word, dictionary_id, created_at) VALUES (?, ?, ?)",
-                word_data
-            )
-            
-            # 更新字典的更新时间
-            self.db.execute_query(
-                "UPDATE dictionaries SET updated_at = ? WHERE id = ?",
-                (current_time, dictionary_id)
-            )
+            # 检查、插入和更新时间在同一个事务中完成，只提交一次
+            with self.db.transaction():
+                # 检查字典是否存在
+                if not self._dictionary_exists(dictionary_id):
+                    raise ValueError(f"字典不存在: ID {dictionary_id}")
+                
+                # 去除首尾空白后写入临时表，重复的和字典中已有的词条不再插入；
+                # 去空白和滤掉空词条都由内置的map、filter完成，不必每个词条执行一次Python生成器
+                current_time = _now_text()
+                added_count = self.db.execute_with_values(
+                    _INSERT_NEW_WORDS_SQL, filter(None, map(str.strip, words)),
+                    (dictionary_id, current_time)
+                ).rowcount
+                
+                if not added_count:
+                    return 0
+                
+                # 更新字典的更新时间和词条数量
+                self.db.execute_query(_TOUCH_DICTIONARY_SQL, (current_time, added_count, dictionary_id))
             
             logging.info(f"添加词条成功: {added_count} 个词条添加到字典 {dictionary_id}")
             return added_count
@@ -308,23 +438,16 @@ class DictionaryManager:
             if not word_ids:
                 return 0
             
-            # 构建删除查询
-            placeholders = ','.join(['?'] * len(word_ids))
-            query = f"""DELETE FROM words 
-                       WHERE id IN ({placeholders}) 
-                       AND dictionary_id = ?"""
-            
-            params = word_ids + [dictionary_id]
-            cursor = self.db.execute_query(query, params)
-            
-            deleted_count = cursor.rowcount
-            
-            # 更新字典的更新时间
-            if deleted_count > 0:
-                self.db.execute_query(
-                    "UPDATE dictionaries SET updated_at = ? WHERE id = ?",
-                    (datetime.now(), dictionary_id)
-                )
+            # 删除和更新时间在同一个事务中完成；ID写入临时表后连接删除，
+            # 语句文本固定可以命中语句缓存，也不受SQLite变量数上限的限制
+            with self.db.transaction():
+                cursor = self.db.execute_with_values(_DELETE_WORDS_BY_ID_SQL, word_ids, (dictionary_id,))
+                
+                deleted_count = cursor.rowcount
+                
+                # 更新字典的更新时间和词条数量
+                if deleted_count > 0:
+                    self.db.execute_query(_TOUCH_DICTIONARY_SQL, (_now_text(), -deleted_count, dictionary_id))
             
             logging.info(f"删除词条成功: {deleted_count} 个词条从字典 {dictionary_id} 删除")
             return deleted_count
@@ -333,14 +456,20 @@ class DictionaryManager:
             logging.error(f"删除词条失败: {e}")
             return 0
     
-    def search_words(self, dictionary_id: int, keyword: str, limit: int = 1000) -> List[Dict[str, Any]]:
+    def search_words(self, dictionary_id: int, keyword: str, limit: int = 1000,
+                     prefix: bool = False) -> List[Dict[str, Any]]:
         """
         在字典中搜索词条
         
+        默认查找包含关键词的词条，按词条排序，需要逐条检查字典中的词条。prefix为True时只查找以关键词开头的词条，
+        关键词按字面匹配（不把%和_当作通配符），与LIKE一样不区分ASCII字母的大小写，结果按不区分大小写的顺序排列，
+        只读取索引中前缀范围内的词条。
+        
         Args:
             dictionary_id: 字典ID
             keyword: 搜索关键词
             limit: 结果数量限制
+            prefix: 是否按前缀搜索
             
         Returns:
             List[Dict[str, Any]]: 搜索结果
@@ -349,20 +478,17 @@ class DictionaryManager:
             if not keyword.strip():
                 return self.get_words(dictionary_id, limit=limit)
             
-            rows = self.db.fetch_all(
-                """SELECT w.*, 
-                          GROUP_CONCAT(t.name) as tag_names
-                   FROM words w
-                   LEFT JOIN word_tags wt ON w.id = wt.word_id
-                   LEFT JOIN tags t ON wt.tag_id = t.id
-                   WHERE w.dictionary_id = ? AND w.word LIKE ?
-                   GROUP BY w.id
-                   ORDER BY w.word
-                   LIMIT ?""",
-                (dictionary_id, f"%{keyword}%", limit)
-            )
+            if prefix:
+                low, high = _prefix_range(keyword.translate(_ASCII_LOWER))
+                rows = self.db.fetch_all(_SEARCH_WORDS_BY_PREFIX_SQL, (dictionary_id, low, high, limit))
+            else:
+                # 先沿(dictionary_id, word)索引按词条顺序筛选，取够limit条即停止，再只为这些词条查询标签
+                rows = self.db.fetch_all(_SEARCH_WORDS_SQL, (dictionary_id, f"%{keyword}%", limit))
+            if not rows:
+                return []
             
-            return [dict(row) for row in rows]
+            tag_rows = self.db.fetch_all_with_values(_SELECT_TAG_NAMES_BY_ID_SQL, (row['id'] for row in rows))
+            return self._with_tag_names(rows, tag_rows)
             
         except Exception as e:
             logging.error(f"搜索词条失败: {e}")
@@ -383,38 +509,77 @@ class DictionaryManager:
         try:
             if limit is None:
                 # 获取所有数据
-                rows = self.db.fetch_all(
-                    """SELECT w.*,
-                              GROUP_CONCAT(t.name) as tag_names
-                       FROM words w
-                       LEFT JOIN word_tags wt ON w.id = wt.word_id
-                       LEFT JOIN tags t ON wt.tag_id = t.id
-                       WHERE w.dictionary_id = ?
-                       GROUP BY w.id
-                       ORDER BY w.id DESC""",
-                    (dictionary_id,)
-                )
+                return list(self.iter_words(dictionary_id))
             else:
                 # 限制数量
-                rows = self.db.fetch_all(
-                    """SELECT w.*,
-                              GROUP_CONCAT(t.name) as tag_names
-                       FROM words w
-                       LEFT JOIN word_tags wt ON w.id = wt.word_id
-                       LEFT JOIN tags t ON wt.tag_id = t.id
-                       WHERE w.dictionary_id = ?
-                       GROUP BY w.id
-                       ORDER BY w.id DESC
-                       LIMIT ? OFFSET ?""",
-                    (dictionary_id, limit, offset)
-                )
+                rows = self.db.fetch_all(_SELECT_WORDS_PAGE_SQL, (dictionary_id, limit, offset))
             
-            return [dict(row) for row in rows]
+            return self._with_tag_names(rows, self._tag_rows_in_id_range(dictionary_id, rows))
             
         except Exception as e:
             logging.error(f"获取词条失败: {e}")
             return []
     
+    def iter_words(self, dictionary_id: int, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        逐批读取字典中的全部词条，顺序与get_words相同，不会一次性把整个字典载入内存
+        
+        Args:
+            dictionary_id: 字典ID
+            chunk_size: 每批从数据库读取的行数
+            
+        Yields:
+            Dict[str, Any]: 词条信息
+        """
+        rows_iter = self.db.iter_rows(_SELECT_WORDS_SQL, (dictionary_id,), chunk_size)
+        while True:
+            rows = list(islice(rows_iter, chunk_size))
+            if not rows:
+                break
+            yield from self._with_tag_names(rows, self._tag_rows_in_id_range(dictionary_id, rows))
+    
+    def _tag_rows_in_id_range(self, dictionary_id: int, rows: List[Any]) -> List[Any]:
+        """
+        查询按ID倒序读取的一批词条的标签名称
+        
+        这批词条是字典在其最小、最大ID之间的全部词条，按ID范围查询即可，语句文本固定。
+        
+        Args:
+            dictionary_id: 字典ID
+            rows: 按ID倒序排列的词条行
+            
+        Returns:
+            List[Any]: (词条ID, 标签名称) 行
+        """
+        if not rows:
+            return []
+        return self.db.fetch_all(_SELECT_TAG_NAMES_IN_RANGE_SQL,
+                                 (dictionary_id, rows[-1]['id'], rows[0]['id']))
+    
+    @staticmethod
+    def _with_tag_names(rows: List[Any], tag_rows: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        把标签名称合并到词条中，tag_names与原先GROUP_CONCAT的结果相同：逗号分隔，没有标签时为None
+        
+        Args:
+            rows: 词条行
+            tag_rows: (词条ID, 标签名称) 行
+            
+        Returns:
+            List[Dict[str, Any]]: 词条信息
+        """
+        names_by_word = defaultdict(list)
+        for word_id, name in tag_rows:
+            names_by_word[word_id].append(name)
+        
+        words = []
+        for row in rows:
+            word = dict(row)
+            names = names_by_word.get(word['id'])
+            word['tag_names'] = ','.join(names) if names else None
+            words.append(word)
+        return words
+    
     def get_words_by_tag(self, dictionary_id: int, tag_id: int) -> List[Dict[str, Any]]:
         """
         根据标签获取词条
@@ -456,33 +621,30 @@ class DictionaryManager:
             int: 成功复制的词条数量
         """
         try:
-            # 检查字典是否存在
-            if not self.get_dictionary_by_id(source_dict_id):
-                raise ValueError(f"源字典不存在: ID {source_dict_id}")
-            if not self.get_dictionary_by_id(target_dict_id):
-                raise ValueError(f"目标字典不存在: ID {target_dict_id}")
-            
-            # 构建查询条件
-            if word_ids:
-                placeholders = ','.join(['?'] * len(word_ids))
-                where_clause = f"AND w.id IN ({placeholders})"
-                params = [source_dict_id] + word_ids
-            else:
-                where_clause = ""
-                params = [source_dict_id]
-            
-            # 获取要复制的词条
-            query = f"""SELECT w.word FROM words w 
-                       WHERE w.dictionary_id = ? {where_clause}"""
-            
-            rows = self.db.fetch_all(query, params)
-            words = [row['word'] for row in rows]
-            
-            if not words:
-                return 0
-            
-            # 添加到目标字典
-            copied_count = self.add_words(target_dict_id, words)
+            # 检查和复制在同一个事务中完成
+            with self.db.transaction():
+                # 检查字典是否存在
+                if not self._dictionary_exists(source_dict_id):
+                    raise ValueError(f"源字典不存在: ID {source_dict_id}")
+                if not self._dictionary_exists(target_dict_id):
+                    raise ValueError(f"目标字典不存在: ID {target_dict_id}")
+                
+                # 直接在数据库中复制词条，不必把词条读到Python再逐条插入；
+                # 指定的词条ID写入临时表，不受SQLite变量数上限的限制。rowcount是实际插入的词条数量
+                current_time = _now_text()
+                if word_ids:
+                    copied_count = self.db.execute_with_values(
+                        _COPY_WORDS_BY_ID_SQL, word_ids, (target_dict_id, current_time, source_dict_id)
+                    ).rowcount
+                else:
+                    copied_count = self.db.execute_query(
+                        _COPY_ALL_WORDS_SQL, (target_dict_id, current_time, source_dict_id)
+                    ).rowcount
+                if not copied_count:
+                    return 0
+                
+                # 更新目标字典的更新时间和词条数量
+                self.db.execute_query(_TOUCH_DICTIONARY_SQL, (current_time, copied_count, target_dict_id))
             
             logging.info(f"复制词条成功: {copied_count} 个词条从字典 {source_dict_id} 复制到字典 {target_dict_id}")
             return copied_count
@@ -502,10 +664,9 @@ class DictionaryManager:
             int: 词条数量
         """
         try:
-            result = self.db.fetch_one(
-                "SELECT COUNT(*) as count FROM words WHERE dictionary_id = ?",
-                (dictionary_id,)
-            )
+            # 词条数量就是字典表中的一列，按主键读取一行，不再另加进程内缓存：
+            # 去重等其他模块也会修改词条，缓存需要跨模块失效，而节省的只是一次主键查询
+            result = self.db.fetch_one(_WORD_COUNT_SQL, (dictionary_id,))
             return result['count'] if result else 0
             
         except Exception as e:
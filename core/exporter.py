@@ -2,15 +2,73 @@
 字典导出功能模块
 提供字典数据的导出功能，支持多种格式和过滤条件
 """
+import csv
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 from .database import db_manager
 from .dictionary_manager import dictionary_manager
 from .file_handler import file_handler
-from config.settings import DEFAULT_EXPORT_FORMAT, EXPORT_BATCH_SIZE
+from config.settings import DEFAULT_EXPORT_FORMAT, EXPORT_BATCH_SIZE, BACKUP_COMPRESS_LEVEL, ANALYSIS_MAX_WORKERS
+
+
+# 进程池无法启动子进程或子进程异常退出时抛出的错误，遇到时改为依次导出
+_POOL_ERRORS = (BrokenProcessPool, OSError)
+
+# 支持的导出格式，以及按文件扩展名判断的导出格式
+_SUPPORTED_FORMATS = frozenset(('txt', 'json', 'csv', 'xlsx'))
+_FORMAT_MAP = {
+    '.txt': 'txt',
+    '.json': 'json',
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.xls': 'xlsx'
+}
+
+# 导出词条时读取的列；TXT只需要词条文本
+_EXPORT_COLUMNS = "w.id, w.word, w.created_at"
+_EXPORT_TXT_COLUMNS = "w.word"
+
+# Excel工作表的最大行号（从0开始），超出后在新的工作表中继续写入
+_XLSX_MAX_ROW = 1048575
+# 表头格式与pandas的to_excel相同
+_XLSX_HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+# 文件名中不能使用的字符，导出时替换为下划线
+_UNSAFE_FILENAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+# 流式写出JSON时词条列表所在位置的占位值，先按原格式生成外层结构，再在占位处逐批写入词条
+_JSON_WORDS_PLACEHOLDER = "\0words\0"
+
+
+def _write_lines(file, lines: Iterable[str]):
+    """
+    把逐行生成的文本每EXPORT_BATCH_SIZE行拼接成一个字符串写出
+    
+    每行调用一次write的开销比写入本身更大，按批拼接后write的调用次数减少到原来的几千分之一。
+    
+    Args:
+        file: 以文本模式打开的文件
+        lines: 带换行符的各行文本
+    """
+    lines_iter = iter(lines)
+    while True:
+        batch = list(islice(lines_iter, EXPORT_BATCH_SIZE))
+        if not batch:
+            break
+        file.write(''.join(batch))
 
 
 class DictionaryExporter:
@@ -21,10 +79,11 @@ class DictionaryExporter:
         self.db = db_manager
         self.dict_manager = dictionary_manager
         self.file_handler = file_handler
-        self.supported_formats = ['txt', 'json', 'csv', 'xlsx']
+        self.supported_formats = _SUPPORTED_FORMATS
     
     def export_dictionary(self, dictionary_id: int, file_path: str, format: str = None, 
-                         include_tags: bool = True, encoding: str = 'utf-8') -> bool:
+                         include_tags: bool = True, encoding: str = 'utf-8',
+                         dictionary: Dict[str, Any] = None) -> bool:
         """
         导出完整字典
         
@@ -34,13 +93,15 @@ class DictionaryExporter:
             format: 导出格式，如果为None则根据文件扩展名判断
             include_tags: 是否包含标签信息
             encoding: 文件编码
+            dictionary: 已查询到的字典信息，为None时按ID查询
             
         Returns:
             bool: 导出是否成功
         """
         try:
             # 检查字典是否存在
-            dictionary = self.dict_manager.get_dictionary_by_id(dictionary_id)
+            if dictionary is None:
+                dictionary = self.dict_manager.get_dictionary_by_id(dictionary_id)
             if not dictionary:
                 raise ValueError(f"字典不存在: ID {dictionary_id}")
             
@@ -51,18 +112,22 @@ class DictionaryExporter:
             if format not in self.supported_formats:
                 raise ValueError(f"不支持的导出格式: {format}")
             
-            # 获取词条数据
-            words_data = self._get_dictionary_words(dictionary_id, include_tags)
-            
-            if not words_data:
+            # 词条数量随增删词条同步维护，不必先读出全部词条再计数
+            total_words = dictionary['word_count']
+            if not total_words:
                 logging.warning(f"字典 {dictionary_id} 中没有词条")
                 return False
             
-            # 执行导出
-            success = self._export_by_format(words_data, file_path, format, encoding, dictionary)
+            # 逐批读取词条并写出，不把整个字典载入内存
+            if format == 'txt':
+                query, params = self._build_dictionary_query(dictionary_id, _EXPORT_TXT_COLUMNS)
+                success = self._export_txt_query(query, params, file_path, encoding)
+            else:
+                words_data = self._get_dictionary_words(dictionary_id, include_tags)
+                success = self._export_by_format(words_data, file_path, format, encoding, dictionary, total_words)
             
             if success:
-                logging.info(f"字典导出成功: {dictionary['name']} -> {file_path} ({len(words_data)} 个词条)")
+                logging.info(f"字典导出成功: {dictionary['name']} -> {file_path} ({total_words} 个词条)")
             
             return success
             
@@ -95,18 +160,21 @@ class DictionaryExporter:
             if format is None:
                 format = self._detect_format_from_path(file_path)
             
-            # 获取过滤后的词条数据
-            words_data = self._get_filtered_words(dictionary_id, filters)
-            
-            if not words_data:
+            # 先计数，再逐批读取过滤后的词条并写出
+            total_words = self._count_filtered_words(dictionary_id, filters)
+            if not total_words:
                 logging.warning("没有符合过滤条件的词条")
                 return False
             
-            # 执行导出
-            success = self._export_by_format(words_data, file_path, format, encoding, dictionary)
+            if format == 'txt':
+                query, params = self._build_filter_query(dictionary_id, filters, _EXPORT_TXT_COLUMNS)
+                success = self._export_txt_query(query, params, file_path, encoding)
+            else:
+                words_data = self._get_filtered_words(dictionary_id, filters)
+                success = self._export_by_format(words_data, file_path, format, encoding, dictionary, total_words)
             
             if success:
-                logging.info(f"过滤词条导出成功: {len(words_data)} 个词条 -> {file_path}")
+                logging.info(f"过滤词条导出成功: {total_words} 个词条 -> {file_path}")
             
             return success
             
@@ -133,17 +201,15 @@ class DictionaryExporter:
             if format is None:
                 format = self._detect_format_from_path(file_path)
             
-            # 准备导出数据
-            export_data = self._prepare_analysis_export_data(analysis_result)
-            
             # 执行导出
             if format == 'json':
-                import json
                 Path(file_path).parent.mkdir(parents=True, exist_ok=True)
                 with open(file_path, 'w', encoding='utf-8') as file:
-                    json.dump(analysis_result, file, ensure_ascii=False, indent=2)
+                    json.dump(analysis_result, file, ensure_ascii=False, indent=2,
+                              default=dict)  # matched_words_detail是Mapping而不是dict
                 success = True
             elif format in ['csv', 'xlsx']:
+                export_data = self._prepare_analysis_export_data(analysis_result)
                 success = self._export_by_format(export_data, file_path, format, 'utf-8')
             else:
                 # TXT格式
@@ -159,7 +225,8 @@ class DictionaryExporter:
             return False
     
     def batch_export_dictionaries(self, dictionary_ids: List[int], 
-                                 output_dir: str, format: str = None) -> Dict[int, bool]:
+                                 output_dir: str, format: str = None,
+                                 parallel: bool = False) -> Dict[int, bool]:
         """
         批量导出字典
         
@@ -167,6 +234,7 @@ class DictionaryExporter:
             dictionary_ids: 字典ID列表
             output_dir: 输出目录
             format: 导出格式
+            parallel: 是否把各字典分发到多个进程并行导出，适合词条很多的大字典；进程池不可用时改为依次导出
             
         Returns:
             Dict[int, bool]: 字典ID到导出结果的映射
@@ -179,10 +247,12 @@ class DictionaryExporter:
         # 确保输出目录存在
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
+        # 一次查询取回所有字典的信息，再确定每个字典的输出文件路径
+        dictionaries = self.dict_manager.get_dictionaries_by_ids(dictionary_ids)
+        export_jobs = {}
         for dictionary_id in dictionary_ids:
             try:
-                # 获取字典信息
-                dictionary = self.dict_manager.get_dictionary_by_id(dictionary_id)
+                dictionary = dictionaries.get(dictionary_id)
                 if not dictionary:
                     results[dictionary_id] = False
                     continue
@@ -190,21 +260,61 @@ class DictionaryExporter:
                 # 构建输出文件路径
                 safe_name = self._make_safe_filename(dictionary['name'])
                 file_path = Path(output_dir) / f"{safe_name}.{format}"
+                export_jobs[dictionary_id] = (dictionary['name'], str(file_path))
                 
-                # 导出字典
-                success = self.export_dictionary(dictionary_id, str(file_path), format)
-                results[dictionary_id] = success
-                
-                if success:
-                    logging.info(f"批量导出成功: {dictionary['name']}")
-                else:
-                    logging.error(f"批量导出失败: {dictionary['name']}")
-                    
             except Exception as e:
                 logging.error(f"批量导出字典 {dictionary_id} 失败: {e}")
                 results[dictionary_id] = False
         
-        return results
+        max_workers = min(ANALYSIS_MAX_WORKERS, len(export_jobs))
+        file_paths = [file_path for _, file_path in export_jobs.values()]
+        
+        # 不同字典的名称替换不安全字符后可能相同，写同一个文件时只能依次导出，后导出的覆盖先导出的
+        if parallel and max_workers > 1 and len(set(file_paths)) == len(file_paths):
+            # 各字典只读取自己的词条、写入各自的文件，分发到多个进程并行导出
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(_export_dictionary_worker, dictionary_id, file_path, format,
+                                        dictionaries[dictionary_id]): dictionary_id
+                        for dictionary_id, (_, file_path) in export_jobs.items()
+                    }
+                    for future in as_completed(futures):
+                        dictionary_id = futures[future]
+                        try:
+                            self._collect_batch_export(results, dictionary_id, export_jobs[dictionary_id][0],
+                                                       future.result())
+                        except _POOL_ERRORS:
+                            raise
+                        except Exception as e:
+                            logging.error(f"批量导出字典 {dictionary_id} 失败: {e}")
+                            results[dictionary_id] = False
+            except _POOL_ERRORS as e:
+                logging.warning(f"进程池不可用，改为依次导出: {e}")
+        
+        # 依次导出尚未得到结果的字典
+        for dictionary_id, (name, file_path) in export_jobs.items():
+            if dictionary_id in results:
+                continue
+            try:
+                success = self.export_dictionary(dictionary_id, file_path, format,
+                                                 dictionary=dictionaries[dictionary_id])
+                self._collect_batch_export(results, dictionary_id, name, success)
+            except Exception as e:
+                logging.error(f"批量导出字典 {dictionary_id} 失败: {e}")
+                results[dictionary_id] = False
+        
+        # 按传入顺序返回
+        return {dictionary_id: results[dictionary_id] for dictionary_id in dictionary_ids if dictionary_id in results}
+    
+    def _collect_batch_export(self, results: Dict[int, bool], dictionary_id: int, name: str, success: bool):
+        """记录批量导出中单个字典的结果"""
+        results[dictionary_id] = success
+        
+        if success:
+            logging.info(f"批量导出成功: {name}")
+        else:
+            logging.error(f"批量导出失败: {name}")
     
     def create_backup(self, backup_path: str, include_data: bool = True) -> bool:
         """
@@ -218,14 +328,11 @@ class DictionaryExporter:
             bool: 备份是否成功
         """
         try:
-            import zipfile
-            import json
-            from datetime import datetime
-            
             # 确保备份目录存在
             Path(backup_path).parent.mkdir(parents=True, exist_ok=True)
             
-            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED,
+                                 compresslevel=BACKUP_COMPRESS_LEVEL) as zipf:
                 # 备份数据库
                 if include_data:
                     db_backup_success = self.db.backup_database("temp_backup.db")
@@ -282,9 +389,6 @@ class DictionaryExporter:
             bool: 恢复是否成功
         """
         try:
-            import zipfile
-            import json
-            
             if not Path(backup_path).exists():
                 raise FileNotFoundError(f"备份文件不存在: {backup_path}")
             
@@ -297,19 +401,15 @@ class DictionaryExporter:
                 
                 # 恢复数据库
                 if "database.db" in zipf.namelist():
-                    zipf.extract("database.db", "temp_restore/")
-                    db_restore_success = self.db.restore_database("temp_restore/database.db")
+                    # 直接从压缩包中读取数据库，不再解压到工作目录下的临时目录
+                    with zipf.open("database.db") as database_file:
+                        db_restore_success = self.db.restore_from_stream(database_file)
                     
                     if db_restore_success:
                         logging.info("数据库恢复成功")
                     else:
                         logging.error("数据库恢复失败")
                         return False
-                    
-                    # 清理临时文件
-                    import shutil
-                    if Path("temp_restore").exists():
-                        shutil.rmtree("temp_restore")
                 
                 # 恢复配置文件
                 config_files = ["config/settings.py", "config/regex_patterns.json"]
@@ -325,91 +425,115 @@ class DictionaryExporter:
             logging.error(f"备份恢复失败: {e}")
             return False
     
-    def _get_dictionary_words(self, dictionary_id: int, include_tags: bool = True) -> List[Dict[str, Any]]:
-        """获取字典中的词条数据"""
-        try:
-            query = """
-                SELECT w.id, w.word, w.created_at
-                FROM words w
-                WHERE w.dictionary_id = ?
-                ORDER BY w.word
-            """
-            
-            rows = self.db.fetch_all(query, (dictionary_id,))
-            return [dict(row) for row in rows]
-            
-        except Exception as e:
-            logging.error(f"获取字典词条失败: {e}")
-            return []
+    def _build_dictionary_query(self, dictionary_id: int,
+                                columns: str = _EXPORT_COLUMNS) -> Tuple[str, List[Any]]:
+        """构建读取字典中全部词条的查询"""
+        query = f"""
+            SELECT {columns}
+            FROM words w
+            WHERE w.dictionary_id = ?
+            ORDER BY w.word
+        """
+        return query, [dictionary_id]
+    
+    def _get_dictionary_words(self, dictionary_id: int, include_tags: bool = True) -> Iterator[Dict[str, Any]]:
+        """逐批读取字典中的词条数据，不会一次性把整个字典载入内存"""
+        query, params = self._build_dictionary_query(dictionary_id)
+        
+        for row in self.db.iter_rows(query, tuple(params), EXPORT_BATCH_SIZE):
+            yield dict(row)
+    
+    def _build_filter_query(self, dictionary_id: int, filters: Dict[str, Any],
+                            columns: str = _EXPORT_COLUMNS) -> Tuple[str, List[Any]]:
+        """构建过滤词条的查询，计数和读取词条共用同一组条件"""
+        base_query = f"""
+            SELECT {columns}
+            FROM words w
+            WHERE w.dictionary_id = ?
+        """
+        
+        params = [dictionary_id]
+        conditions = []
+        
+        # 关键词过滤
+        if 'keyword' in filters and filters['keyword']:
+            conditions.append("w.word LIKE ?")
+            params.append(f"%{filters['keyword']}%")
+        
+        # 长度过滤
+        if 'min_length' in filters:
+            conditions.append("LENGTH(w.word) >= ?")
+            params.append(filters['min_length'])
+        
+        if 'max_length' in filters:
+            conditions.append("LENGTH(w.word) <= ?")
+            params.append(filters['max_length'])
+        
+        # 添加条件到查询
+        if conditions:
+            base_query += " AND " + " AND ".join(conditions)
+        
+        base_query += " ORDER BY w.word"
+        
+        # 限制结果数量
+        if 'limit' in filters:
+            base_query += " LIMIT ?"
+            params.append(filters['limit'])
+        
+        return base_query, params
     
-    def _get_filtered_words(self, dictionary_id: int, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """获取过滤后的词条"""
+    def _count_filtered_words(self, dictionary_id: int, filters: Dict[str, Any]) -> int:
+        """统计符合过滤条件的词条数量"""
         try:
-            base_query = """
-                SELECT w.id, w.word, w.created_at
-                FROM words w
-                WHERE w.dictionary_id = ?
-            """
-            
-            params = [dictionary_id]
-            conditions = []
-            
-            # 关键词过滤
-            if 'keyword' in filters and filters['keyword']:
-                conditions.append("w.word LIKE ?")
-                params.append(f"%{filters['keyword']}%")
-            
-            # 长度过滤
-            if 'min_length' in filters:
-                conditions.append("LENGTH(w.word) >= ?")
-                params.append(filters['min_length'])
-            
-            if 'max_length' in filters:
-                conditions.append("LENGTH(w.word) <= ?")
-                params.append(filters['max_length'])
-            
-            # 添加条件到查询
-            if conditions:
-                base_query += " AND " + " AND ".join(conditions)
-            
-            base_query += " ORDER BY w.word"
-            
-            # 限制结果数量
-            if 'limit' in filters:
-                base_query += " LIMIT ?"
-                params.append(filters['limit'])
-            
-            rows = self.db.fetch_all(base_query, params)
-            return [dict(row) for row in rows]
+            query, params = self._build_filter_query(dictionary_id, filters)
+            row = self.db.fetch_one(f"SELECT COUNT(*) AS count FROM ({query})", tuple(params))
+            return row['count'] if row else 0
             
         except Exception as e:
-            logging.error(f"获取过滤词条失败: {e}")
-            return []
+            logging.error(f"统计过滤词条失败: {e}")
+            return 0
     
-    def _export_by_format(self, words_data: List[Dict[str, Any]], file_path: str, 
+    def _get_filtered_words(self, dictionary_id: int, filters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """逐批读取过滤后的词条"""
+        query, params = self._build_filter_query(dictionary_id, filters)
+        
+        for row in self.db.iter_rows(query, tuple(params), EXPORT_BATCH_SIZE):
+            yield dict(row)
+    
+    def _export_by_format(self, words_data: Iterable[Dict[str, Any]], file_path: str, 
                          format: str, encoding: str = 'utf-8', 
-                         dictionary: Dict[str, Any] = None) -> bool:
-        """根据格式导出数据"""
+                         dictionary: Dict[str, Any] = None, total_words: int = None) -> bool:
+        """
+        根据格式导出数据，TXT、CSV和JSON边读取边写出
+        
+        Args:
+            words_data: 词条数据，可以是逐批读取的迭代器
+            file_path: 导出文件路径
+            format: 导出格式
+            encoding: 文件编码
+            dictionary: 字典信息，写入JSON
+            total_words: 词条数量，写入JSON；为None时读出全部词条后计数
+            
+        Returns:
+            bool: 导出是否成功
+        """
         try:
             if format == 'txt':
-                words = [word_data['word'] for word_data in words_data]
-                return self.file_handler.export_txt(words, file_path, encoding)
+                return self._write_txt(words_data, file_path, encoding)
             
             elif format == 'json':
-                # 构建JSON数据结构
-                export_data = {
-                    "dictionary_info": dictionary or {},
-                    "export_time": datetime.now().isoformat(),
-                    "total_words": len(words_data),
-                    "words": words_data
-                }
-                return self.file_handler.export_json([export_data], file_path, encoding)
+                if total_words is None:
+                    words_data = list(words_data)
+                    total_words = len(words_data)
+                return self._write_json(words_data, file_path, encoding, dictionary, total_words)
             
             elif format == 'csv':
-                return self.file_handler.export_csv(words_data, file_path, encoding)
+                return self._write_csv(words_data, file_path, encoding)
             
             elif format == 'xlsx':
-                return self.file_handler.export_excel(words_data, file_path)
+                if xlsxwriter is not None:
+                    return self._write_xlsx(words_data, file_path)
+                return self.file_handler.export_excel(list(words_data), file_path)
             
             else:
                 logging.error(f"不支持的导出格式: {format}")
@@ -419,25 +543,168 @@ class DictionaryExporter:
             logging.error(f"格式化导出失败: {e}")
             return False
     
-    def _detect_format_from_path(self, file_path: str) -> str:
-        """从文件路径检测格式"""
-        suffix = Path(file_path).suffix.lower()
-        
-        format_map = {
-            '.txt': 'txt',
-            '.json': 'json',
-            '.csv': 'csv',
-            '.xlsx': 'xlsx',
-            '.xls': 'xlsx'
+    def _export_txt_query(self, query: str, params: List[Any], file_path: str, encoding: str) -> bool:
+        """
+        把只查询词条一列的结果导出为TXT，每行一个词条
+        
+        按批读取普通元组，每批拼接成一个字符串写出，不为每一行构造sqlite3.Row和字典。
+        
+        Args:
+            query: 只查询词条文本的SQL语句
+            params: 查询参数
+            file_path: 导出文件路径
+            encoding: 文件编码
+            
+        Returns:
+            bool: 导出是否成功
+        """
+        try:
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            with open(file_path, 'w', encoding=encoding) as file:
+                for rows in self.db.iter_batches(query, tuple(params), EXPORT_BATCH_SIZE):
+                    file.write('\n'.join([word for (word,) in rows]))
+                    file.write('\n')
+            
+            return True
+            
+        except Exception as e:
+            logging.error(f"TXT格式导出失败: {e}")
+            return False
+    
+    def _write_txt(self, words_data: Iterable[Dict[str, Any]], file_path: str, encoding: str) -> bool:
+        """逐批写出TXT文件，每行一个词条"""
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(file_path, 'w', encoding=encoding) as file:
+            _write_lines(file, (f"{word_data['word']}\n" for word_data in words_data))
+        
+        return True
+    
+    def _write_csv(self, words_data: Iterable[Dict[str, Any]], file_path: str, encoding: str) -> bool:
+        """逐条写出CSV文件，各行的字段相同，按第一行的字段名排序作为表头"""
+        words_iter = iter(words_data)
+        first = next(words_iter, None)
+        if first is None:
+            return False
+        
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(file_path, 'w', encoding=encoding, newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=sorted(first))
+            writer.writeheader()
+            writer.writerow(first)
+            writer.writerows(words_iter)
+        
+        return True
+    
+    def _write_xlsx(self, words_data: Iterable[Dict[str, Any]], file_path: str) -> bool:
+        """
+        用xlsxwriter的constant_memory模式逐行写出Excel文件，内容与file_handler.export_excel相同
+        
+        constant_memory模式每写完一行就把它刷到临时文件，内存占用与行数无关，也不经过DataFrame。
+        
+        Args:
+            words_data: 词条数据，各行的字段相同
+            file_path: 导出文件路径
+            
+        Returns:
+            bool: 导出是否成功
+        """
+        words_iter = iter(words_data)
+        first = next(words_iter, None)
+        if first is None:
+            return False
+        
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        columns = list(first)
+        workbook = xlsxwriter.Workbook(file_path, {
+            'constant_memory': True, 'use_zip64': True,
+            # 词条按原样写成文本，不把以=开头的词条当作公式、把URL写成超链接
+            'strings_to_formulas': False, 'strings_to_urls': False,
+        })
+        try:
+            header_format = workbook.add_format(_XLSX_HEADER_FORMAT)
+            worksheet = None
+            row_index = _XLSX_MAX_ROW
+            for word_data in chain((first,), words_iter):
+                if row_index == _XLSX_MAX_ROW:
+                    worksheet = workbook.add_worksheet()
+                    worksheet.write_row(0, 0, columns, header_format)
+                    row_index = 0
+                row_index += 1
+                worksheet.write_row(row_index, 0, [word_data[column] for column in columns])
+        finally:
+            workbook.close()
+        
+        return True
+    
+    def _write_json(self, words_data: Iterable[Dict[str, Any]], file_path: str, encoding: str,
+                    dictionary: Optional[Dict[str, Any]], total_words: int) -> bool:
+        """
+        逐批写出JSON文件，内容与file_handler.export_json写出的格式相同
+        
+        Args:
+            words_data: 词条数据
+            file_path: 导出文件路径
+            encoding: 文件编码
+            dictionary: 字典信息
+            total_words: 词条数量
+            
+        Returns:
+            bool: 导出是否成功
+        """
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # 外层结构与file_handler.export_json相同，词条列表先用占位值代替
+        export_data = {
+            "dictionary_name": Path(file_path).stem,
+            "export_time": str(datetime.now()),
+            "total_words": 1,
+            "words": [{
+                "dictionary_info": dictionary or {},
+                "export_time": datetime.now().isoformat(),
+                "total_words": total_words,
+                "words": [_JSON_WORDS_PLACEHOLDER]
+            }]
         }
+        text = json.dumps(export_data, ensure_ascii=False, indent=2)
+        head, _, tail = text.rpartition(json.dumps(_JSON_WORDS_PLACEHOLDER))
+        
+        words_iter = iter(words_data)
+        batch = list(islice(words_iter, EXPORT_BATCH_SIZE))
+        if not batch:
+            # 没有词条时与json.dump一样写出空列表
+            head, tail = head.rstrip()[:-1], tail.lstrip()[1:]
+            with open(file_path, 'w', encoding=encoding) as file:
+                file.write(f"{head}[]{tail}")
+            return True
         
-        return format_map.get(suffix, DEFAULT_EXPORT_FORMAT)
+        # 每批词条作为一个列表生成JSON，去掉列表的方括号，再把缩进从第一层加深到占位值所在的层级
+        extra_indent = ' ' * (len(head) - head.rindex('\n') - 1 - 2)
+        head = head[:head.rindex('\n') + 1]
+        
+        with open(file_path, 'w', encoding=encoding) as file:
+            file.write(head)
+            while batch:
+                text = json.dumps(batch, ensure_ascii=False, indent=2)[2:-2]
+                file.write(extra_indent + text.replace('\n', '\n' + extra_indent))
+                batch = list(islice(words_iter, EXPORT_BATCH_SIZE))
+                if batch:
+                    file.write(',\n')
+            file.write(tail)
+        
+        return True
+    
+    def _detect_format_from_path(self, file_path: str) -> str:
+        """从文件路径检测格式"""
+        return _FORMAT_MAP.get(Path(file_path).suffix.lower(), DEFAULT_EXPORT_FORMAT)
     
     def _make_safe_filename(self, name: str) -> str:
         """创建安全的文件名"""
-        import re
-        # 移除或替换不安全的字符
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', name)
+        # 替换不安全的字符
+        safe_name = name.translate(_UNSAFE_FILENAME_CHARS)
         safe_name = safe_name.strip()
         
         # 限制长度
@@ -446,27 +713,23 @@ class DictionaryExporter:
         
         return safe_name or "unnamed"
     
-    def _prepare_analysis_export_data(self, analysis_result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """准备分析结果的导出数据"""
-        export_data = []
-        
+    def _prepare_analysis_export_data(self, analysis_result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """逐条生成分析结果的导出数据，不在内存中另建一份全部词条的列表"""
         # 导出匹配的词条
         for word, patterns in analysis_result.get('matched_words_detail', {}).items():
-            export_data.append({
+            yield {
                 'word': word,
                 'matched_patterns': ', '.join(patterns),
                 'status': 'matched'
-            })
+            }
         
         # 导出未匹配的词条
         for word in analysis_result.get('unmatched_words', []):
-            export_data.append({
+            yield {
                 'word': word,
                 'matched_patterns': '',
                 'status': 'unmatched'
-            })
-        
-        return export_data
+            }
     
     def _export_analysis_txt(self, analysis_result: Dict[str, Any], file_path: str) -> bool:
         """导出分析结果为TXT格式"""
@@ -489,15 +752,14 @@ class DictionaryExporter:
                 
                 # 匹配词条详情
                 file.write("=== 匹配词条 ===\n")
-                for word, patterns in analysis_result.get('matched_words_detail', {}).items():
-                    file.write(f"{word} -> {', '.join(patterns)}\n")
+                _write_lines(file, (f"{word} -> {', '.join(patterns)}\n"
+                                    for word, patterns in analysis_result.get('matched_words_detail', {}).items()))
                 
                 # 未匹配词条
                 unmatched = analysis_result.get('unmatched_words', [])
                 if unmatched:
                     file.write(f"\n=== 未匹配词条 ===\n")
-                    for word in unmatched:
-                        file.write(f"{word}\n")
+                    _write_lines(file, (f"{word}\n" for word in unmatched))
             
             return True
             
@@ -506,6 +768,12 @@ class DictionaryExporter:
             return False
 
 
+def _export_dictionary_worker(dictionary_id: int, file_path: str, format: str,
+                              dictionary: Dict[str, Any]) -> bool:
+    """进程池任务：导出单个字典，子进程使用自己的数据库连接"""
+    return exporter.export_dictionary(dictionary_id, file_path, format, dictionary=dictionary)
+
+
 # 全局导出器实例
 exporter = DictionaryExporter()
 
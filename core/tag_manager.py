@@ -6,7 +6,8 @@
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple
+from itertools import product
+from typing import List, Dict, Optional, Tuple, Iterable
 from .database import DatabaseManager
 
 class TagManager:
@@ -356,42 +357,30 @@ class TagManager:
             self.logger.error(f"获取标签词条失败: {e}")
             return []
     
-    def batch_tag_words(self, word_ids: List[int], tag_ids: List[int]) -> int:
+    def batch_tag_words(self, word_ids: Iterable[int], tag_ids: List[int]) -> int:
         """
         批量为词条添加标签
         
         Args:
-            word_ids: 词条ID列表
+            word_ids: 词条ID序列
             tag_ids: 标签ID列表
             
         Returns:
             成功添加的关联数量
         """
         try:
-            cursor = self.db_manager.get_cursor()
-            added_count = 0
-            
-            for word_id in word_ids:
-                for tag_id in tag_ids:
-                    # 检查关联是否已存在
-                    cursor.execute("""
-                        SELECT 1 FROM word_tags WHERE word_id = ? AND tag_id = ?
-                    """, (word_id, tag_id))
-                    
-                    if not cursor.fetchone():
-                        cursor.execute("""
-                            INSERT INTO word_tags (word_id, tag_id, created_at)
-                            VALUES (?, ?, datetime('now'))
-                        """, (word_id, tag_id))
-                        added_count += 1
+            # 关联表以(word_id, tag_id)为主键，已存在的关联由INSERT OR IGNORE跳过，
+            # 所有关联在同一个事务中批量写入
+            added_count = self.db_manager.execute_many("""
+                INSERT OR IGNORE INTO word_tags (word_id, tag_id)
+                VALUES (?, ?)
+            """, product(word_ids, tag_ids))
             
-            self.db_manager.commit()
             self.logger.info(f"批量添加标签成功: {added_count} 个关联")
             return added_count
             
         except Exception as e:
             self.logger.error(f"批量添加标签失败: {e}")
-            self.db_manager.rollback()
             return 0
     
     def search_tags(self, keyword: str) -> List[Dict]:
@@ -24,6 +24,8 @@ class RegexHelper:
         self.config_path = config_path or (CONFIG_DIR / "regex_patterns.json")
         self.patterns = {}
         self.compiled_patterns = {}
+        self._compiled_index = {}
+        self._info_index = {}
         self.load_patterns()
     
     def load_patterns(self) -> bool:
@@ -129,6 +131,32 @@ class RegexHelper:
         
         if custom_patterns:
             self.compiled_patterns["custom"] = custom_patterns
+        
+        # 按名称建立索引，同名时保留先出现的模式
+        self._compiled_index = {}
+        for category_patterns in self.compiled_patterns.values():
+            for pattern_name, compiled_pattern in category_patterns.items():
+                self._compiled_index.setdefault(pattern_name, compiled_pattern)
+        
+        # 模式信息索引包含编译失败的模式，查找顺序与逐个遍历时一致：先预设后自定义
+        self._info_index = {}
+        for category in self.patterns.get("preset_patterns", {}).values():
+            for pattern in category.get("patterns", []):
+                self._info_index.setdefault(pattern["name"], pattern)
+        for pattern in self.patterns.get("custom_patterns", []):
+            self._info_index.setdefault(pattern["name"], pattern)
+    
+    def get_compiled(self, pattern_name: str) -> Optional[re.Pattern]:
+        """
+        获取编译后的模式
+        
+        Args:
+            pattern_name: 模式名称
+            
+        Returns:
+            Optional[re.Pattern]: 编译后的正则对象，如果不存在则返回None
+        """
+        return self._compiled_index.get(pattern_name)
     
     def get_categories(self) -> List[str]:
         """
@@ -188,18 +216,7 @@ class RegexHelper:
         Returns:
             Optional[Dict[str, Any]]: 模式信息，如果不存在则返回None
         """
-        # 在预设模式中查找
-        for category in self.patterns.get("preset_patterns", {}).values():
-            for pattern in category.get("patterns", []):
-                if pattern["name"] == pattern_name:
-                    return pattern
-        
-        # 在自定义模式中查找
-        for pattern in self.patterns.get("custom_patterns", []):
-            if pattern["name"] == pattern_name:
-                return pattern
-        
-        return None
+        return self._info_index.get(pattern_name)
     
     def add_custom_pattern(self, name: str, pattern: str, description: str = "") -> bool:
         """
@@ -290,12 +307,7 @@ class RegexHelper:
         """
         try:
             # 查找编译后的模式
-            compiled_pattern = None
-            
-            for category_patterns in self.compiled_patterns.values():
-                if pattern_name in category_patterns:
-                    compiled_pattern = category_patterns[pattern_name]
-                    break
+            compiled_pattern = self._compiled_index.get(pattern_name)
             
             if compiled_pattern is None:
                 logging.warning(f"模式不存在: {pattern_name}")
@@ -341,12 +353,7 @@ class RegexHelper:
         """
         try:
             # 查找编译后的模式
-            compiled_pattern = None
-            
-            for category_patterns in self.compiled_patterns.values():
-                if pattern_name in category_patterns:
-                    compiled_pattern = category_patterns[pattern_name]
-                    break
+            compiled_pattern = self._compiled_index.get(pattern_name)
             
             if compiled_pattern is None:
                 return []